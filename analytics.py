@@ -0,0 +1,308 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from result_store import date_from_day, day_key
+
+# Rolling windows in days
+WINDOWS = (7, 30)
+
+STORAGE = "Storage (mcft)"
+INFLOW = "Inflow (cusecs)"
+OUTFLOW = "Outflow (cusecs)"
+CAPACITY = "Full Capacity (mcft)"
+LAST_YEAR = "Storage as on same day last year (mcft)"
+
+# The portal's own sum row; totals are computed from the reservoirs instead
+PORTAL_TOTAL = "TOTAL"
+
+# One cusec flowing for a day, in million cubic feet
+MCFT_PER_CUSEC_DAY = 86400 / 1e6
+
+RESERVOIR_COLUMNS = ["storage", "storage_yoy_delta", "storage_yoy_pct"] + [
+    f"{name}_{window}d"
+    for window in WINDOWS
+    for name in ("readings", "storage_mean", "inflow_sum", "outflow_sum", "net_flow_mcft")
+]
+SYSTEM_COLUMNS = ["reservoirs", "storage", "capacity", "storage_pct", "inflow", "outflow",
+                  "storage_last_year", "storage_yoy_delta", "storage_yoy_pct", "portal_total_storage"] + [
+    f"{name}_{window}d"
+    for window in WINDOWS
+    for name in ("storage_mean", "inflow_sum", "outflow_sum", "net_flow_mcft")
+]
+
+
+def measure(df, column):
+    """A measurement as float64, rounded back to the portal's two decimals"""
+    if column not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return df[column].astype("float64").round(2)
+
+
+def percent_change(delta, base):
+    """delta / base in percent, missing where the base is 0 or missing"""
+    return (delta / base.where(base != 0) * 100).round(2)
+
+
+def rolling_columns(frame, windows=WINDOWS, group=None):
+    """
+    Time-based rolling storage means and flow sums of a frame indexed by Date.
+
+    Windows cover calendar days, so gaps in the scraped dates shorten a
+    window instead of stretching it; the sums are over the dates present.
+    """
+    # In hundredths the measurements are whole numbers, so the rolling sums are
+    # exact and do not depend on where the window's history starts
+    measures = ["storage", "inflow", "outflow"]
+    frame = frame.assign(**{column: (frame[column] * 100).round() for column in measures})
+    columns = {}
+    for window in windows:
+        source = frame.groupby(group, observed=True, sort=True) if group else frame
+        rolled = source[measures].rolling(f"{window}D", min_periods=1)
+        sums = rolled.sum() / 100
+        if group:
+            columns[f"readings_{window}d"] = rolled.count()["storage"].to_numpy()
+        columns[f"storage_mean_{window}d"] = (rolled.mean()["storage"] / 100).round(2).to_numpy()
+        columns[f"inflow_sum_{window}d"] = sums["inflow"].round(2).to_numpy()
+        columns[f"outflow_sum_{window}d"] = sums["outflow"].round(2).to_numpy()
+        # Missing where either flow is missing, a one-sided balance is not a balance
+        columns[f"net_flow_mcft_{window}d"] = (
+            (sums["inflow"] - sums["outflow"]) * MCFT_PER_CUSEC_DAY
+        ).round(3).to_numpy()
+    return columns
+
+
+def reservoir_aggregates(typed):
+    """
+    Rolling balances and year-over-year deltas per reservoir and date.
+
+    Args:
+        typed: Typed readings (ResultStore.query(typed=True)) with
+            RESERVOIR, Date and the measurement columns.
+
+    Returns:
+        A DataFrame with RESERVOIR, Date and RESERVOIR_COLUMNS, ordered by
+        reservoir and date. The portal's TOTAL row is left out.
+    """
+    df = pd.DataFrame({
+        "RESERVOIR": typed["RESERVOIR"].astype(str),
+        "Date": typed["Date"],
+        "storage": measure(typed, STORAGE),
+        "inflow": measure(typed, INFLOW),
+        "outflow": measure(typed, OUTFLOW),
+        "last_year": measure(typed, LAST_YEAR),
+    })
+    df = df[df["RESERVOIR"] != PORTAL_TOTAL].sort_values(["RESERVOIR", "Date"], kind="stable")
+
+    out = df[["RESERVOIR", "Date", "storage"]].reset_index(drop=True)
+    delta = (df["storage"] - df["last_year"]).round(2).to_numpy()
+    out["storage_yoy_delta"] = delta
+    out["storage_yoy_pct"] = percent_change(pd.Series(delta), df["last_year"].reset_index(drop=True))
+    for name, values in rolling_columns(df.set_index("Date"), group="RESERVOIR").items():
+        out[name] = values
+    return out[["RESERVOIR", "Date"] + RESERVOIR_COLUMNS]
+
+
+def system_totals(typed):
+    """
+    System-wide totals across all reservoirs per date.
+
+    Totals are summed from the individual reservoirs; the portal's TOTAL row
+    is kept next to them as portal_total_storage for cross-checking.
+
+    Returns:
+        A DataFrame with Date and SYSTEM_COLUMNS, ordered by date.
+    """
+    df = pd.DataFrame({
+        "RESERVOIR": typed["RESERVOIR"].astype(str),
+        "Date": typed["Date"],
+        "storage": measure(typed, STORAGE),
+        "capacity": measure(typed, CAPACITY),
+        "inflow": measure(typed, INFLOW),
+        "outflow": measure(typed, OUTFLOW),
+        "storage_last_year": measure(typed, LAST_YEAR),
+    })
+    portal = df[df["RESERVOIR"] == PORTAL_TOTAL].set_index("Date")["storage"]
+    reservoirs = df[df["RESERVOIR"] != PORTAL_TOTAL]
+
+    grouped = reservoirs.groupby("Date", sort=True)
+    totals = grouped[["storage", "capacity", "inflow", "outflow", "storage_last_year"]].sum(min_count=1).round(2)
+    totals.insert(0, "reservoirs", grouped["storage"].count())
+    totals["storage_pct"] = percent_change(totals["storage"], totals["capacity"])
+    totals["storage_yoy_delta"] = (totals["storage"] - totals["storage_last_year"]).round(2)
+    totals["storage_yoy_pct"] = percent_change(totals["storage_yoy_delta"], totals["storage_last_year"])
+    totals["portal_total_storage"] = portal.reindex(totals.index)
+    for name, values in rolling_columns(totals).items():
+        totals[name] = values
+    return totals.reset_index()[["Date"] + SYSTEM_COLUMNS]
+
+
+class ReservoirAnalytics:
+    """
+    Materialized rolling aggregates over the readings of a ResultStore.
+
+    The aggregates live in two tables of the store's SQLite file:
+    reservoir_aggregates keyed by (reservoir, day) and system_totals keyed
+    by day. update() only recomputes the days a newly committed (or
+    revised) date can influence: the date itself and the days up to the
+    longest window after it, reading just that slice of history through
+    the (reservoir, date) index.
+
+    The dates taken in are tracked by the store's commit_seq, which is
+    assigned under the write lock. Unlike a wall-clock timestamp, it
+    cannot fall behind the watermark when several processes commit at once.
+    """
+
+    def __init__(self, store):
+        """
+        Args:
+            store (ResultStore): Store whose readings are aggregated
+        """
+        self.store = store
+        reservoir_columns = ", ".join(f"{column} REAL" for column in RESERVOIR_COLUMNS)
+        system_columns = ", ".join(f"{column} REAL" for column in SYSTEM_COLUMNS)
+        with store.lock, store.connection:
+            store.connection.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS reservoir_aggregates (
+                    reservoir TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    {reservoir_columns},
+                    PRIMARY KEY (reservoir, day)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS system_totals (
+                    day TEXT PRIMARY KEY,
+                    {system_columns}
+                );
+                CREATE TABLE IF NOT EXISTS analytics_state (
+                    key TEXT PRIMARY KEY,
+                    value REAL NOT NULL
+                );
+                """
+            )
+            # Aggregates written with a committed_at watermark continue from the matching commit_seq
+            store.connection.execute(
+                "INSERT OR IGNORE INTO analytics_state "
+                "SELECT 'commit_seq', COALESCE(MAX(dates.commit_seq), 0) FROM analytics_state, dates "
+                "WHERE analytics_state.key = 'committed_at' AND dates.committed_at <= analytics_state.value "
+                "HAVING COUNT(*) > 0"
+            )
+            store.connection.execute("DELETE FROM analytics_state WHERE key = 'committed_at'")
+
+    def update(self):
+        """
+        Bring the aggregates up to date with the dates committed since the last update
+
+        Several processes may update the same store. The aggregates are only
+        written if no other update has moved the watermark in the meantime;
+        otherwise the newer dates are read again, so an update computed from
+        older data never overwrites a newer one.
+
+        Returns:
+            The number of newly committed dates that were taken in
+        """
+        while True:
+            with self.store.lock:
+                watermark = self.watermark()
+                changed = self.store.connection.execute(
+                    "SELECT date, commit_seq FROM dates WHERE commit_seq > ?", (watermark,)
+                ).fetchall()
+            if not changed:
+                return 0
+            if self.write_update(watermark, changed):
+                return len(changed)
+
+    def watermark(self):
+        """commit_seq of the last date taken into the aggregates"""
+        row = self.store.connection.execute("SELECT value FROM analytics_state WHERE key = 'commit_seq'").fetchone()
+        return row[0] if row else 0
+
+    def write_update(self, watermark, changed):
+        """Recompute the days the changed dates affect, False if another update got there first"""
+        days = sorted(day_key(date_str) for date_str, _ in changed)
+        first = datetime.strptime(days[0], "%Y-%m-%d")
+        last_affected = datetime.strptime(days[-1], "%Y-%m-%d") + timedelta(days=max(WINDOWS) - 1)
+        context_start = first - timedelta(days=max(WINDOWS) - 1)
+
+        # Earlier days are only read as window context, the affected days are rewritten
+        typed = self.store.query(start=context_start.strftime("%d-%m-%Y"),
+                                 end=last_affected.strftime("%d-%m-%Y"), typed=True)
+        per_reservoir = reservoir_aggregates(typed)
+        per_reservoir = per_reservoir[per_reservoir["Date"] >= first]
+        totals = system_totals(typed)
+        totals = totals[totals["Date"] >= first]
+
+        bounds = (first.strftime("%Y-%m-%d"), last_affected.strftime("%Y-%m-%d"))
+        with self.store.lock, self.store.connection:
+            connection = self.store.connection
+            # Hold the write lock while checking, so no other update can slip in between
+            connection.execute("BEGIN IMMEDIATE")
+            if self.watermark() != watermark:
+                return False
+            connection.execute("DELETE FROM reservoir_aggregates WHERE day BETWEEN ? AND ?", bounds)
+            connection.execute("DELETE FROM system_totals WHERE day BETWEEN ? AND ?", bounds)
+            connection.executemany(
+                f"INSERT INTO reservoir_aggregates VALUES ({', '.join('?' * (len(RESERVOIR_COLUMNS) + 2))})",
+                self.records(per_reservoir, ["RESERVOIR"], RESERVOIR_COLUMNS),
+            )
+            connection.executemany(
+                f"INSERT INTO system_totals VALUES ({', '.join('?' * (len(SYSTEM_COLUMNS) + 1))})",
+                self.records(totals, [], SYSTEM_COLUMNS),
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO analytics_state VALUES ('commit_seq', ?)",
+                (max(commit_seq for _, commit_seq in changed),),
+            )
+        return True
+
+    def rebuild(self):
+        """Recompute every aggregate from the full history"""
+        with self.store.lock, self.store.connection:
+            self.store.connection.execute("DELETE FROM analytics_state")
+        return self.update()
+
+    @staticmethod
+    def records(df, keys, columns):
+        """Rows for executemany: keys, day, then the columns with NaN as NULL"""
+        values = df[columns].astype(object).where(df[columns].notna(), None).to_numpy().tolist()
+        days = df["Date"].dt.strftime("%Y-%m-%d").tolist()
+        key_values = df[keys].to_numpy().tolist() if keys else [[] for _ in days]
+        return [[*key, day, *row] for key, day, row in zip(key_values, days, values)]
+
+    def aggregates(self, reservoirs=None, start=None, end=None):
+        """
+        Materialized per-reservoir aggregates, looked up by (reservoir, date)
+
+        Args:
+            reservoirs: A reservoir name or a list of them, None for all
+            start (str): First date (DD-MM-YYYY), None for no lower bound
+            end (str): Last date (DD-MM-YYYY), included
+        """
+        conditions, parameters = [], []
+        if reservoirs is not None:
+            names = [reservoirs] if isinstance(reservoirs, str) else list(reservoirs)
+            conditions.append(f"reservoir IN ({', '.join('?' * len(names))})")
+            parameters.extend(str(name).strip().upper() for name in names)
+        return self.read("reservoir_aggregates", ["RESERVOIR"], RESERVOIR_COLUMNS, conditions, parameters,
+                         start, end, "reservoir, day")
+
+    def totals(self, start=None, end=None):
+        """Materialized system-wide totals per date"""
+        return self.read("system_totals", [], SYSTEM_COLUMNS, [], [], start, end, "day")
+
+    def read(self, table, keys, columns, conditions, parameters, start, end, order):
+        if start is not None:
+            conditions.append("day >= ?")
+            parameters.append(day_key(start))
+        if end is not None:
+            conditions.append("day <= ?")
+            parameters.append(day_key(end))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.store.lock:
+            cursor = self.store.connection.execute(f"SELECT * FROM {table} {where} ORDER BY {order}", parameters)
+            found = cursor.fetchall()
+
+        df = pd.DataFrame(found, columns=keys + ["Date"] + columns)
+        df["Date"] = [date_from_day(day) for day in df["Date"]]
+        return df
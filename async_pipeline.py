@@ -0,0 +1,204 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import run_status
+from http_backend import fetch_page_http, table_from_html
+from throttle import RetryQueue
+
+# Kinds of fetched pages handed from the fetch stage to the parse stage
+CACHED = "cached"
+TABLE = "table"
+HTML = "html"
+
+
+async def run_pipeline(scraper, dates, fetch_concurrency=4, parse_concurrency=2, sink_concurrency=1,
+                       queue_size=16):
+    """
+    Scrapes dates with separate fetch, parse and sink stages.
+
+    The stages run as asyncio tasks connected by bounded queues, so a slow
+    stage makes the one in front of it wait instead of piling up pages in
+    memory. Blocking work (HTTP requests, browser calls, HTML parsing and
+    SQLite commits) runs on a thread pool sized for all stages.
+
+    - fetch: serves the date from the page cache or downloads it. Over HTTP
+      this is the raw page; with the selenium backend the browser reads the
+      table directly.
+    - parse: turns the page into the full table (falling back to the browser
+      if the table is not in the server HTML) and appends the date.
+    - sink: commits each parsed date to the result store.
+
+    Dates that time out or fail go back to the fetch queue after the
+    scraper's retry backoff, up to scraper.max_attempts.
+
+    Cancelling the task stops fetching and parsing, waits until everything
+    already parsed is committed, and re-raises the cancellation.
+
+    Args:
+        scraper: The LakeLevelScraper whose settings, cache and store are used.
+        dates: Unique date strings (DD-MM-YYYY) to scrape.
+        fetch_concurrency: Pages fetched at the same time.
+        parse_concurrency: Pages parsed at the same time.
+        sink_concurrency: Dates committed at the same time.
+        queue_size: Capacity of the parse and sink queues.
+
+    Returns:
+        The table headers of the first committed date, or None if no date
+        was committed.
+    """
+    if not dates:
+        return None
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=fetch_concurrency + parse_concurrency + sink_concurrency)
+    stop = threading.Event()
+    retries = RetryQueue(scraper.retry_base_delay, scraper.retry_max_delay)
+
+    # Only date strings wait here, so this queue is not bounded
+    fetch_queue = asyncio.Queue()
+    parse_queue = asyncio.Queue(queue_size)
+    sink_queue = asyncio.Queue(queue_size)
+    for date_str in dates:
+        fetch_queue.put_nowait(date_str)
+
+    unresolved = [len(dates)]
+    finished = asyncio.Event()
+    first_headers = []
+
+    def run(function, *args):
+        return loop.run_in_executor(executor, function, *args)
+
+    def resolve():
+        unresolved[0] -= 1
+        if unresolved[0] == 0:
+            finished.set()
+
+    def settle(date_str):
+        # Retry dates whose attempt ended in a timeout or error, the rest are final
+        attempt = scraper.status.attempts(date_str)
+        if scraper.status.outcome(date_str) in run_status.RETRYABLE and attempt < scraper.max_attempts:
+            print(f"Retrying {date_str} (attempt {attempt + 1}/{scraper.max_attempts})")
+            loop.call_later(retries.backoff(attempt), fetch_queue.put_nowait, date_str)
+        else:
+            resolve()
+
+    def throttle(date_str):
+        with scraper.metrics.span("throttle", date_str):
+            if not scraper.rate_limiter.acquire(stop):
+                raise asyncio.CancelledError()
+
+    def fetch_one(date_str, url, driver):
+        print(f"Fetching data for date: {date_str}")
+        with scraper.metrics.span("cache", date_str):
+            table = scraper.cache.get(date_str, scraper.table_selector) if scraper.cache else None
+        if table is not None:
+            if not table[0]:
+                print(f"No data published for date: {date_str} (cached)")
+                scraper.status.record(date_str, run_status.NO_DATA, "cached")
+                return None
+            return CACHED, table
+        if scraper.cache_only:
+            print(f"Cache-only mode: {date_str} is not cached")
+            scraper.status.record(date_str, run_status.NOT_CACHED)
+            return None
+
+        throttle(date_str)
+        if scraper.backend == "http":
+            # A failed request raises and is retried, only a missing table goes to the browser
+            return HTML, fetch_page_http(scraper.http_session, url, metrics=scraper.metrics, date_str=date_str)
+        return TABLE, scraper.read_table_with_browser(url, driver, date_str)
+
+    def parse_one(date_str, url, kind, payload):
+        table = payload
+        if kind == HTML:
+            table = table_from_html(payload, url, scraper.table_selector, scraper.no_data_texts,
+                                    scraper.metrics, date_str)
+            if table is None:
+                print(f"Table rows not in server HTML for {date_str}, falling back to the browser")
+                throttle(date_str)
+                table = scraper.read_table_with_browser(url, None, date_str)
+        if kind != CACHED and scraper.cache and table[1]:
+            scraper.cache.put(date_str, scraper.table_selector, *table)
+        return scraper.table_to_rows(date_str, table)
+
+    async def fetcher():
+        # Each fetcher borrows one browser, started only if a page needs it
+        driver = scraper.browsers.acquire() if scraper.backend != "http" else None
+        try:
+            while True:
+                date_str = await fetch_queue.get()
+                url = f"{scraper.base_url}{date_str}"
+                try:
+                    page = await run(fetch_one, date_str, url, driver)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    scraper.record_failure(date_str, e)
+                    settle(date_str)
+                    continue
+
+                if page is None:
+                    resolve()
+                else:
+                    await parse_queue.put((date_str, url, page))
+        finally:
+            if driver is not None:
+                scraper.browsers.release(driver)
+
+    async def parser():
+        while True:
+            date_str, url, (kind, payload) = await parse_queue.get()
+            try:
+                table_headers, rows = await run(parse_one, date_str, url, kind, payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                scraper.record_failure(date_str, e)
+                settle(date_str)
+                continue
+
+            if rows:
+                await sink_queue.put((date_str, table_headers, rows))
+            else:
+                settle(date_str)
+
+    async def sink():
+        while True:
+            date_str, table_headers, rows = await sink_queue.get()
+            try:
+                await run(scraper.commit_result, date_str, table_headers, rows)
+                if not first_headers:
+                    first_headers.append(table_headers)
+            except Exception as e:
+                print(f"Could not save {date_str}: {e}")
+                scraper.status.record(date_str, run_status.ERROR, str(e) or type(e).__name__)
+            finally:
+                sink_queue.task_done()
+                resolve()
+
+    fetchers = [asyncio.create_task(fetcher()) for _ in range(fetch_concurrency)]
+    parsers = [asyncio.create_task(parser()) for _ in range(parse_concurrency)]
+    sinks = [asyncio.create_task(sink()) for _ in range(sink_concurrency)]
+    print(f"Pipeline started: {fetch_concurrency} fetchers, {parse_concurrency} parsers, {sink_concurrency} sinks")
+
+    try:
+        await finished.wait()
+    except asyncio.CancelledError:
+        # Stop taking new pages, but save everything that was already parsed
+        stop.set()
+        for task in fetchers + parsers:
+            task.cancel()
+        await asyncio.gather(*fetchers, *parsers, return_exceptions=True)
+        print(f"Saving {sink_queue.qsize()} parsed dates before stopping")
+        await sink_queue.join()
+        raise
+    finally:
+        stop.set()
+        tasks = fetchers + parsers + sinks
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return first_headers[0] if first_headers else None
@@ -0,0 +1,172 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from lake_level_scraper import LakeLevelScraper
+from standin_server import StandInServer
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def benchmark_dates(server, count):
+    """
+    Picks the dates to scrape in a benchmark run.
+
+    Uses the dates the stand-in has data for, extended with consecutive
+    synthetic dates when more are requested and the server synthesizes them.
+    """
+    dates = list(server.page_dates)
+    if count <= len(dates) or not server.synthesize:
+        return dates[:count]
+
+    day = datetime(2000, 1, 1)
+    while len(dates) < count:
+        date_str = day.strftime("%d-%m-%Y")
+        if date_str not in server.pages:
+            dates.append(date_str)
+        day += timedelta(days=1)
+    return dates
+
+
+def run_once(server, dates, backend, workers, workdir, browser_profile="full"):
+    """
+    Scrapes the dates once against the stand-in and measures the run.
+
+    Returns:
+        A dict with dates/sec, p50/p95 per-date latency, KB transferred per
+        page, the peak of the Python heap (traced by tracemalloc, so Chrome
+        and its child processes are not included) and the per-status date
+        counts.
+    """
+    run_dir = tempfile.mkdtemp(prefix=f"{backend}-{browser_profile}-{workers}-", dir=workdir)
+    excel_file_path = os.path.join(run_dir, "dates.xlsx")
+    pd.DataFrame({"Date": dates}).to_excel(excel_file_path, index=False)
+
+    scraper = LakeLevelScraper(excel_file_path, os.path.join(run_dir, "output.xlsx"),
+                               backend=backend, requests_per_second=0, browser_profile=browser_profile)
+    scraper.base_url = server.base_url
+    scraper.retry_base_delay = 0.1
+
+    latencies = []
+    extract = scraper.extract_data_for_date
+
+    def timed_extract(date_str, driver=None):
+        started = time.perf_counter()
+        try:
+            return extract(date_str, driver=driver)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    scraper.extract_data_for_date = timed_extract
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.scrape_all_dates(workers=workers, incremental=False)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    statuses = {}
+    for entry in scraper.status.entries.values():
+        statuses[entry["status"]] = statuses.get(entry["status"], 0) + 1
+
+    bytes_per_page = scraper.metrics.bytes_per_page()
+    return {
+        "backend": backend,
+        "profile": browser_profile if backend == "selenium" else "-",
+        "workers": workers,
+        "dates": len(dates),
+        "seconds": round(elapsed, 3),
+        "dates_per_sec": round(len(dates) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "kb_per_page": round(bytes_per_page / 1024, 1) if bytes_per_page is not None else "",
+        "heap_peak_mb": round(peak / (1024 * 1024), 2),
+        "statuses": statuses,
+    }
+
+
+def browser_available(workdir):
+    """Whether Chrome can be started here, with the reason if it cannot"""
+    try:
+        driver = LakeLevelScraper("unused.xlsx", os.path.join(workdir, "probe.xlsx")).create_driver()
+    except Exception as e:
+        return False, str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+    driver.quit()
+    return True, ""
+
+
+def print_results(results):
+    columns = ["backend", "profile", "workers", "dates", "seconds", "dates_per_sec", "p50_ms", "p95_ms",
+               "kb_per_page", "heap_peak_mb", "statuses"]
+    rows = [[str(result.get(column, "")) for column in columns] for result in results]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput benchmark for LakeLevelScraper against a local stand-in")
+    parser.add_argument("--backends", nargs="+", default=["http", "selenium"], choices=["http", "selenium"])
+    parser.add_argument("--browser-profiles", nargs="+", default=["full", "lean"], choices=["full", "lean"],
+                        help="browser profiles to run the selenium backend with")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--dates", type=int, default=50, help="number of dates per run")
+    parser.add_argument("--latency", type=float, default=0.05, help="server latency per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    parser.add_argument("--csv", default="Reservoir-wise_Segregated_Data_by_Date.csv")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    server = StandInServer(args.csv, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           missing_rate=args.missing_rate, synthesize=True, seed=1)
+    dates = benchmark_dates(server, args.dates)
+    print(f"Benchmarking {len(dates)} dates, latency {args.latency}s, error rate {args.error_rate}, "
+          f"missing rate {args.missing_rate}")
+
+    results = []
+    with server, tempfile.TemporaryDirectory() as workdir:
+        for backend in args.backends:
+            if backend == "selenium":
+                available, reason = browser_available(workdir)
+                if not available:
+                    print(f"Skipping selenium backend: {reason}")
+                    continue
+
+            profiles = args.browser_profiles if backend == "selenium" else ["full"]
+            for browser_profile in profiles:
+                for workers in args.workers:
+                    result = run_once(server, dates, backend, workers, workdir, browser_profile)
+                    results.append(result)
+                    print(f"  {backend} {result['profile']} x{workers}: {result['dates_per_sec']} dates/sec")
+
+    print()
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"\nResults saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
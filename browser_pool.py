@@ -0,0 +1,227 @@
+import contextlib
+import queue
+import threading
+
+from run_status import RETRYABLE
+from throttle import RetryQueue
+
+
+class LazyDriver:
+    """
+    Stands in for a WebDriver and only starts the real one on first use.
+
+    Lets pool workers hand a driver to extract_data_for_date without paying
+    for a Chrome launch when every date is served from the cache or over HTTP.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.driver = None
+
+    def __getattr__(self, name):
+        if self.driver is None:
+            self.driver = self.factory()
+        return getattr(self.driver, name)
+
+    @property
+    def started(self):
+        return self.driver is not None
+
+    def alive(self):
+        """Whether the browser is unstarted or still answering"""
+        if self.driver is None:
+            return True
+        try:
+            self.driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+
+class BrowserSession:
+    """
+    Keeps browsers warm across scraper calls.
+
+    Drivers are borrowed with acquire() and handed back with release(); a
+    returned browser stays open and is reused by the next caller, so a
+    single-date probe followed by a full run starts Chrome only once.
+
+    Used as a context manager the browsers stay open until the with-block
+    ends. Outside of one, done() closes them at the end of every call.
+    """
+
+    def __init__(self, factory):
+        """
+        Args:
+            factory: Callable that starts a new WebDriver
+        """
+        self.factory = factory
+        self.lock = threading.Lock()
+        self.idle = []
+        self.depth = 0
+
+    def acquire(self):
+        """Borrow a browser, warm if one is idle, otherwise started on first use"""
+        with self.lock:
+            while self.idle:
+                driver = self.idle.pop()
+                if driver.alive():
+                    return driver
+                driver.quit()
+        return LazyDriver(self.factory)
+
+    def release(self, driver, broken=False):
+        """Hand a borrowed browser back, closing it if it is broken"""
+        if broken or not driver.alive():
+            driver.quit()
+            return
+        with self.lock:
+            self.idle.append(driver)
+
+    def close(self):
+        """Close every idle browser, returns how many were running"""
+        with self.lock:
+            idle, self.idle = self.idle, []
+        closed = sum(1 for driver in idle if driver.started)
+        for driver in idle:
+            driver.quit()
+        return closed
+
+    def done(self):
+        """End of a scraper call: close the browsers unless held open by a with-block"""
+        if self.depth == 0:
+            return self.close()
+        return 0
+
+    def __enter__(self):
+        with self.lock:
+            self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self.lock:
+            self.depth -= 1
+        self.done()
+
+
+def scrape_dates_in_pool(scraper, dates, workers=4, max_attempts=3, retry_queue=None):
+    """
+    Scrapes a list of dates with several browser sessions running in parallel.
+
+    Each worker thread borrows its own WebDriver from scraper.browsers, a
+    warm one when available, and pulls dates from a shared queue. Requests are paced by the scraper's
+    shared rate limiter rather than by sleeps in the workers. A date whose
+    attempt ends in a timeout or error is put on a retry queue with
+    exponential backoff and jitter, and the workers carry on with other
+    dates until it is due again.
+
+    Results are yielded as soon as a date is final, so the caller can save
+    each date while the pool keeps working; the output order is restored
+    from the input when it is exported.
+
+    Args:
+        scraper: The LakeLevelScraper used to create drivers and extract data.
+        dates: A list of unique date strings (DD-MM-YYYY) to scrape.
+        workers: Number of browser sessions to run at the same time.
+        max_attempts: Attempts per date before it is reported as failed.
+        retry_queue: RetryQueue to use, for custom backoff settings.
+
+    Yields:
+        (date_str, (actual_headers, data)) once per date. Dates that could
+        not be scraped are yielded with ([], []).
+    """
+    work = queue.Queue()
+    for date_str in dates:
+        work.put(date_str)
+
+    retries = retry_queue or RetryQueue()
+    results = queue.Queue()
+    stop = threading.Event()
+    lock = threading.Lock()
+    unresolved = [len(dates)]
+    started = [0]
+    workers = max(1, min(workers, len(dates)))
+
+    def next_date():
+        date_str = retries.pop_due()
+        if date_str is not None:
+            return date_str
+        try:
+            return work.get_nowait()
+        except queue.Empty:
+            return None
+
+    def worker(worker_id):
+        # Each worker borrows one browser, started only once a page needs it
+        driver = scraper.browsers.acquire()
+        broken = False
+        profiling = scraper.profiler.profile_thread() if scraper.profiler else contextlib.nullcontext()
+        try:
+            with profiling:
+                while not stop.is_set():
+                    date_str = next_date()
+                    if date_str is None:
+                        with lock:
+                            if unresolved[0] == 0:
+                                return
+                        # Only retries that are not due yet are left
+                        stop.wait(min(retries.seconds_until_due() or 0.2, 0.2))
+                        continue
+
+                    attempt = scraper.status.attempts(date_str) + 1
+                    if attempt == 1:
+                        with lock:
+                            started[0] += 1
+                            print(f"[worker {worker_id}] Processing {started[0]}/{len(dates)}: {date_str}")
+                    else:
+                        print(f"[worker {worker_id}] Retrying {date_str} (attempt {attempt}/{max_attempts})")
+
+                    result = scraper.extract_data_for_date(date_str, driver=driver)
+
+                    if scraper.status.outcome(date_str) in RETRYABLE and attempt < max_attempts:
+                        retries.schedule(date_str, attempt)
+                        continue
+
+                    with lock:
+                        unresolved[0] -= 1
+                    results.put((date_str, result))
+        except Exception as e:
+            print(f"[worker {worker_id}] Stopped with error: {e}")
+            broken = True
+        finally:
+            scraper.browsers.release(driver, broken)
+
+    threads = [
+        threading.Thread(target=worker, args=(n + 1,), daemon=True)
+        for n in range(workers)
+    ]
+    print(f"Starting {len(threads)} browser workers")
+    for thread in threads:
+        thread.start()
+
+    delivered = 0
+    try:
+        while delivered < len(dates):
+            try:
+                # Wait with a timeout so Ctrl+C is still delivered to the main thread
+                item = results.get(timeout=0.5)
+            except queue.Empty:
+                if results.empty() and not any(thread.is_alive() for thread in threads):
+                    print("All workers stopped before every date was scraped")
+                    return
+                continue
+
+            delivered += 1
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
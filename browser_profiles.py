@@ -0,0 +1,74 @@
+from selenium.common.exceptions import WebDriverException
+
+FULL = "full"
+LEAN = "lean"
+BROWSER_PROFILES = (FULL, LEAN)
+
+# Requests the lean profile never sends: images, media, fonts and trackers.
+# Stylesheets are kept, they decide which cells are visible to innerText.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*facebook.com/tr*", "*youtube.com*", "*ytimg.com*",
+]
+
+# Chrome content settings: 2 means blocked
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+}
+
+# Bytes received for the document and every resource it loaded so far.
+# Cross-origin resources without Timing-Allow-Origin report 0.
+PAGE_BYTES_SCRIPT = """
+let total = 0;
+for (const entry of performance.getEntriesByType('navigation')) total += entry.transferSize || 0;
+for (const entry of performance.getEntriesByType('resource')) total += entry.transferSize || 0;
+return total;
+"""
+
+
+def apply_lean_options(chrome_options):
+    """
+    Sets up Chrome options for the lean profile.
+
+    The eager page-load strategy makes driver.get() return once the DOM is
+    ready instead of after every image and script has loaded; readiness of
+    the table is detected separately anyway.
+    """
+    chrome_options.page_load_strategy = "eager"
+    chrome_options.add_experimental_option("prefs", LEAN_PREFS)
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_argument("--mute-audio")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-background-networking")
+    return chrome_options
+
+
+def block_requests(driver, url_patterns=BLOCKED_URL_PATTERNS):
+    """
+    Blocks requests matching the URL patterns through the DevTools protocol.
+
+    Returns:
+        True if blocking is active, False if the driver has no CDP support.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(url_patterns)})
+        return True
+    except (AttributeError, WebDriverException) as e:
+        print(f"Request blocking not available: {e}")
+        return False
+
+
+def page_transfer_bytes(driver):
+    """Bytes transferred for the current page, or None if it cannot be measured"""
+    try:
+        size = driver.execute_script(PAGE_BYTES_SCRIPT)
+    except WebDriverException:
+        return None
+    return int(size) if isinstance(size, (int, float)) else None
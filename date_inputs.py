@@ -0,0 +1,136 @@
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Format of the dates in the input files and the portal's URLs
+DATE_FORMAT = "%d-%m-%Y"
+
+
+def parse_date_column(values):
+    """
+    Parses a column of input dates in one vectorized pass.
+
+    Strings must be DD-MM-YYYY, optionally followed by a time after a space.
+    Other values (Excel dates, datetimes) are converted as they are. Empty
+    cells are skipped.
+
+    Args:
+        values: A pandas Series, e.g. the first column of the input file.
+
+    Returns:
+        A tuple: (dates, invalid). dates is a list of DD-MM-YYYY strings in
+        input order, duplicates kept. invalid is a list of (index, value)
+        for every non-empty value that could not be parsed.
+    """
+    values = values[values.notna()]
+    is_text = values.map(lambda value: isinstance(value, str)).astype(bool)
+
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    if is_text.any():
+        # Drop everything from the first space, e.g. a time of day
+        date_part = values[is_text].astype("str").str.replace(r"(?s) .*", "", regex=True)
+        parsed[is_text] = pd.to_datetime(date_part, format=DATE_FORMAT, errors="coerce")
+    if not is_text.all():
+        parsed[~is_text] = pd.to_datetime(values[~is_text], errors="coerce")
+
+    valid = parsed.notna()
+    invalid = list(zip(values.index[~valid], values[~valid]))
+
+    # Slicing ISO day strings is several times faster than dt.strftime
+    iso = pd.Series(np.datetime_as_string(parsed[valid].to_numpy().astype("datetime64[D]"))).astype("str")
+    return (iso.str[8:10] + "-" + iso.str[5:7] + "-" + iso.str[:4]).tolist(), invalid
+
+
+def read_date_file(path):
+    """
+    Reads the dates in the first column of an Excel or CSV file.
+
+    The first row is the header, unless it is a date itself.
+
+    Returns:
+        A tuple: (dates, invalid) as from parse_date_column, with the
+        invalid values keyed by their row number in the file.
+    """
+    if os.path.splitext(path)[1].lower() == ".csv":
+        df = pd.read_csv(path, usecols=[0], dtype=str, keep_default_na=False, na_values=[""])
+    else:
+        df = pd.read_excel(path, usecols=[0])
+
+    column = df.iloc[:, 0]
+    header_dates, _ = parse_date_column(pd.Series([df.columns[0]], dtype=object))
+    dates, invalid = parse_date_column(column)
+
+    # Row 1 is the header, so data row i is row i + 2 of the file
+    invalid = [(index + 2, value) for index, value in invalid]
+    return header_dates + dates, invalid
+
+
+def report_invalid_dates(invalid, limit=10):
+    """Prints the rows whose date could not be parsed, the first `limit` in full"""
+    if not invalid:
+        return
+    print(f"Could not parse {len(invalid)} dates (expected DD-MM-YYYY):")
+    for row_number, value in invalid[:limit]:
+        print(f"  row {row_number}: {value!r}")
+    if len(invalid) > limit:
+        print(f"  ... and {len(invalid) - limit} more")
+
+
+def parse_date_arg(value):
+    """A date from DD-MM-YYYY or YYYY-MM-DD text, or a date/datetime"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for date_format in (DATE_FORMAT, "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date: {value!r} (expected DD-MM-YYYY or YYYY-MM-DD)")
+
+
+class DateRange:
+    """
+    Dates from start to end (inclusive) every `step` days, as DD-MM-YYYY.
+
+    The dates are generated when iterated, so a multi-year backfill needs
+    neither an input file nor the whole list in memory. Iterating again
+    starts over, and len() and `in` are computed without iterating.
+    """
+
+    def __init__(self, start, end, step=1):
+        """
+        Args:
+            start: First date, DD-MM-YYYY or YYYY-MM-DD text or a date
+            end: Last date, included when it falls on a step
+            step (int): Days between dates
+        """
+        self.start = parse_date_arg(start)
+        self.end = parse_date_arg(end)
+        self.step = int(step)
+        if self.step < 1:
+            raise ValueError(f"Step must be at least one day, got {step}")
+
+    def __iter__(self):
+        day = self.start
+        stride = timedelta(days=self.step)
+        while day <= self.end:
+            yield day.strftime(DATE_FORMAT)
+            day += stride
+
+    def __len__(self):
+        return max(0, (self.end - self.start).days // self.step + 1)
+
+    def __contains__(self, date_str):
+        try:
+            day = datetime.strptime(date_str, DATE_FORMAT).date()
+        except (TypeError, ValueError):
+            return False
+        return self.start <= day <= self.end and (day - self.start).days % self.step == 0
+
+    def __repr__(self):
+        return (f"DateRange({self.start.strftime(DATE_FORMAT)} to {self.end.strftime(DATE_FORMAT)}, "
+                f"every {self.step} days)")
@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+
+
+def unique_dates(dates):
+    """Returns the dates with duplicates removed, keeping first-seen order"""
+    return list(dict.fromkeys(dates))
+
+
+def load_existing_rows(output_file_path, desired_headers):
+    """
+    Reads the rows of a previous run's output, grouped by date.
+
+    Runs write the desired headers the portal served, in order, followed
+    by "Date". The file is only reused when its columns are laid out like
+    that, so a run with a different column set never mixes incompatible
+    rows.
+
+    Args:
+        output_file_path: Path of the Excel (or CSV) file written by an earlier run.
+        desired_headers: The headers the scraper is configured to extract.
+
+    Returns:
+        A tuple: (headers, rows_by_date). headers are the file's columns,
+        including "Date"; rows_by_date maps each date string to its list of
+        rows (as lists of strings, including the trailing date). ([], {}) if
+        there is no usable file.
+    """
+    if not os.path.exists(output_file_path):
+        return [], {}
+
+    try:
+        if os.path.splitext(output_file_path)[1].lower() == ".csv":
+            df = pd.read_csv(output_file_path, dtype=str, keep_default_na=False)
+        else:
+            # Outputs split per reservoir or year have one sheet per part
+            df = pd.concat(pd.read_excel(output_file_path, sheet_name=None, dtype=str, keep_default_na=False).values())
+    except Exception as e:
+        print(f"Could not read existing output {output_file_path}: {e}")
+        return [], {}
+
+    headers = list(df.columns)
+    found = [header for header in desired_headers if header in headers]
+    if not found or headers != found + ["Date"]:
+        print(f"Existing output {output_file_path} has different columns, scraping every date again")
+        return [], {}
+
+    # Earlier runs wrote one copy of a date's rows per occurrence in the input
+    df = df.drop_duplicates()
+
+    rows_by_date = {}
+    for row in df.itertuples(index=False):
+        rows_by_date.setdefault(row[-1], []).append(list(row))
+    return headers, rows_by_date
+
+
+def plan_dates(dates, done_dates=()):
+    """
+    Picks the dates that actually need to be fetched.
+
+    Args:
+        dates: All dates from the input, in order and with duplicates.
+        done_dates: Dates that already have rows and can be skipped.
+
+    Returns:
+        Each date that is not done yet, once, in first-seen order.
+    """
+    return [date_str for date_str in unique_dates(dates) if date_str not in done_dates]
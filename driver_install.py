@@ -0,0 +1,65 @@
+import json
+import os
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+# Where the resolved ChromeDriver path is remembered between runs
+DRIVER_PATH_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "lake-level-scraper", "chromedriver.json")
+
+
+def read_cached_driver_path(cache_file=DRIVER_PATH_CACHE):
+    """The remembered ChromeDriver path, or None if unknown or deleted"""
+    try:
+        with open(cache_file) as handle:
+            path = json.load(handle).get("path")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return path if path and os.path.isfile(path) else None
+
+
+def resolve_driver_path(cache_file=DRIVER_PATH_CACHE, refresh=False):
+    """
+    Finds the ChromeDriver binary, running ChromeDriverManager only when needed.
+
+    ChromeDriverManager().install() looks the driver version up online on
+    every call. The path it returns is remembered in cache_file, so later
+    runs start straight away and also work offline.
+
+    Args:
+        cache_file: JSON file the resolved path is stored in.
+        refresh: Ignore the remembered path and resolve it again, for
+            example after a Chrome update made the cached driver too old.
+
+    Returns:
+        The path of the ChromeDriver executable.
+    """
+    if not refresh:
+        path = read_cached_driver_path(cache_file)
+        if path:
+            return path
+
+    path = ChromeDriverManager().install()
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    with open(cache_file, "w") as handle:
+        json.dump({"path": path}, handle)
+    return path
+
+
+def start_chrome(options, cache_file=DRIVER_PATH_CACHE):
+    """
+    Starts Chrome with the cached ChromeDriver.
+
+    If the cached driver no longer matches the installed Chrome, the driver
+    is resolved again once and Chrome is started with the new one.
+    """
+    cached = read_cached_driver_path(cache_file)
+    try:
+        return webdriver.Chrome(service=Service(resolve_driver_path(cache_file)), options=options)
+    except SessionNotCreatedException:
+        if cached is None:
+            raise
+        print("Cached ChromeDriver does not match Chrome, resolving it again")
+        return webdriver.Chrome(service=Service(resolve_driver_path(cache_file, refresh=True)), options=options)
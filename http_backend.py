@@ -0,0 +1,253 @@
+from html.parser import HTMLParser
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import stage_span
+from page_ready import NoDataForDate, html_has_no_data
+
+try:
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional, the stdlib parser is used without it
+    lxml_html = None
+
+
+def create_http_session(pool_size=10):
+    """
+    Creates a keep-alive HTTP session for fetching lake-level pages.
+
+    Args:
+        pool_size: Number of connections kept open per host. Should be at
+            least the number of workers sharing the session.
+
+    Returns:
+        A requests.Session with a pooled HTTPAdapter mounted for http and https.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": "Mozilla/5.0 (lake-level-scraper)"})
+    return session
+
+
+def parse_selector(table_selector):
+    """
+    Splits a simple CSS selector like "table.a.b" into its tag and classes.
+
+    Returns:
+        A tuple: (tag, set_of_classes)
+    """
+    tag, *classes = table_selector.strip().split(".")
+    return (tag or "table").lower(), set(classes)
+
+
+def clean_text(text):
+    """Collapses whitespace inside a cell the way the browser renders it"""
+    return " ".join(text.split())
+
+
+def parse_table_lxml(page_html, table_selector):
+    """Finds and reads the first matching table with lxml"""
+    tag, classes = parse_selector(table_selector)
+    document = lxml_html.fromstring(page_html)
+
+    for table in document.iter(tag):
+        if not classes <= set((table.get("class") or "").split()):
+            continue
+
+        # Body rows may sit directly in the table; browsers wrap them in a tbody themselves
+        body_rows = table.xpath("./tbody/tr | ./tr")
+        header_rows = table.xpath("./thead/tr")
+        if header_rows:
+            header_row = header_rows[0]
+        else:
+            header_row = next((tr for tr in body_rows if tr.find("th") is not None), None)
+
+        header_texts = []
+        if header_row is not None:
+            header_texts = [clean_text(th.text_content()) for th in header_row.iter("th")]
+
+        rows = []
+        for tr in body_rows:
+            if tr is not header_row:
+                rows.append([clean_text(td.text_content()) for td in tr.iter("td")])
+
+        return header_texts, rows
+
+    return None
+
+
+class TableHTMLParser(HTMLParser):
+    """
+    Stdlib fallback parser that collects the first table matching a selector
+
+    Without a thead, the first body row with th cells is the header row.
+    Rows outside a tbody count as body rows, as they do in the browser.
+    """
+
+    def __init__(self, table_selector):
+        super().__init__()
+        self.tag, self.classes = parse_selector(table_selector)
+        self.found = False
+        self.done = False
+        self.depth = 0
+        self.section = None
+        self.header_texts = None
+        self.rows = []
+        self.current_row = None
+        self.current_cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if not self.found:
+            if tag == self.tag and self.classes <= set((dict(attrs).get("class") or "").split()):
+                self.found = True
+                self.depth = 1
+            return
+
+        if tag == self.tag:
+            self.depth += 1
+        elif tag in ("thead", "tbody", "tfoot"):
+            self.section = tag
+        elif tag == "tr":
+            self.current_row = []
+        elif tag in ("th", "td") and self.current_row is not None:
+            self.current_cell = []
+
+    def handle_endtag(self, tag):
+        if not self.found or self.done:
+            return
+
+        if tag == self.tag:
+            self.depth -= 1
+            if self.depth == 0:
+                self.done = True
+        elif tag in ("thead", "tbody", "tfoot"):
+            self.section = None
+        elif tag in ("th", "td") and self.current_cell is not None:
+            self.current_row.append((tag, clean_text("".join(self.current_cell))))
+            self.current_cell = None
+        elif tag == "tr" and self.current_row is not None:
+            headers = [text for cell_tag, text in self.current_row if cell_tag == "th"]
+            cells = [text for cell_tag, text in self.current_row if cell_tag == "td"]
+            self.current_row = None
+            if self.section == "thead":
+                if self.header_texts is None:
+                    self.header_texts = headers
+            elif self.section != "tfoot":
+                if self.header_texts is None and headers:
+                    self.header_texts = headers
+                else:
+                    self.rows.append(cells)
+
+    def handle_data(self, data):
+        if self.current_cell is not None:
+            self.current_cell.append(data)
+
+
+def parse_table_stdlib(page_html, table_selector):
+    """Finds and reads the first matching table with the stdlib HTMLParser"""
+    parser = TableHTMLParser(table_selector)
+    parser.feed(page_html)
+    parser.close()
+    if not parser.found:
+        return None
+    return parser.header_texts or [], parser.rows
+
+
+def parse_table_html(page_html, table_selector):
+    """
+    Parses a server-rendered table out of page HTML.
+
+    Args:
+        page_html: The page source as a string.
+        table_selector: A "tag.class.class" selector for the target table.
+
+    Returns:
+        A tuple: (header_texts, rows) with all headers and all body cells,
+        or None if no matching table is in the HTML.
+    """
+    if lxml_html is not None:
+        return parse_table_lxml(page_html, table_selector)
+    return parse_table_stdlib(page_html, table_selector)
+
+
+def fetch_page_http(session, url, timeout=30, metrics=None, date_str=None):
+    """
+    Fetches the HTML of a lake-level page.
+
+    Args:
+        session: A session from create_http_session().
+        url: Full URL of the page to fetch.
+        timeout: Request timeout in seconds.
+        metrics: Optional StageMetrics that the request is timed in
+            ("navigate", under date_str) and the page size is added to.
+
+    Returns:
+        The page HTML as a string.
+
+    Raises:
+        requests.RequestException: If the request failed or the server
+            answered with an error status. The date is then retried like any
+            other failed fetch; the browser would not do better.
+    """
+    with stage_span(metrics, "navigate", date_str):
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+
+    if metrics is not None:
+        metrics.record_bytes(len(response.content), date_str)
+    return response.text
+
+
+def table_from_html(page_html, url, table_selector, no_data_texts=None, metrics=None, date_str=None):
+    """
+    Parses the table out of a fetched page.
+
+    A table without body rows counts as missing, like in the browser's
+    page-state check: its rows may be filled in by a script.
+
+    Returns:
+        A tuple: (header_texts, rows), or None if the table or its rows are
+        not in the server-rendered HTML.
+
+    Raises:
+        NoDataForDate: If the table is missing and one of no_data_texts is
+            on the page.
+    """
+    with stage_span(metrics, "extract", date_str):
+        table = parse_table_html(page_html, table_selector)
+        if table is not None and not table[1]:
+            table = None
+        if table is None and no_data_texts and html_has_no_data(page_html, no_data_texts):
+            raise NoDataForDate(url)
+    return table
+
+
+def fetch_table_http(session, url, table_selector, timeout=30, no_data_texts=None, metrics=None, date_str=None):
+    """
+    Fetches a lake-level page over HTTP and parses its table without a browser.
+
+    Args:
+        session: A session from create_http_session().
+        url: Full URL of the page to fetch.
+        table_selector: A "tag.class.class" selector for the target table.
+        timeout: Request timeout in seconds.
+        no_data_texts: Texts that mark a page without data. When the table
+            is missing and one of them is on the page, NoDataForDate is raised.
+        metrics: Optional StageMetrics that the request ("navigate") and
+            the parse ("extract") are timed in, under date_str, and that the
+            page size is added to.
+
+    Returns:
+        A tuple: (header_texts, rows), or None if the table or its rows are
+        not in the server-rendered HTML.
+
+    Raises:
+        NoDataForDate: If the page confirms that nothing is published.
+        requests.RequestException: If the page could not be fetched.
+    """
+    page_html = fetch_page_http(session, url, timeout, metrics, date_str)
+    return table_from_html(page_html, url, table_selector, no_data_texts, metrics, date_str)
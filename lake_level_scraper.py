@@ -0,0 +1,936 @@
+import pandas as pd
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import asyncio
+import contextlib
+import json
+import threading
+import time
+import os
+from datetime import datetime, timedelta
+
+from analytics import ReservoirAnalytics
+from async_pipeline import run_pipeline
+from browser_pool import BrowserSession, scrape_dates_in_pool
+from driver_install import start_chrome
+from browser_profiles import BROWSER_PROFILES, LEAN, apply_lean_options, block_requests, page_transfer_bytes
+from table_snapshot import column_layout, snapshot_table, select_columns
+from projections import resolve_projection
+from http_backend import create_http_session, fetch_table_http
+from page_cache import PageCache
+from date_inputs import DateRange, read_date_file, report_invalid_dates
+from date_schedule import load_existing_rows, plan_dates
+from result_store import ResultStore
+from streaming_export import SPLIT_INTO, SPLITS
+from typed_results import export_typed
+from page_ready import NO_DATA, NO_DATA_TEXTS, NoDataForDate, wait_for_page_state
+from throttle import RetryQueue, TokenBucket
+from work_leases import WorkBoard
+from metrics import RunProfiler, StageMetrics
+import run_status
+
+def extract_table_data(driver, table_selector, column_headers, single_call=True):
+    """
+    Extracts data from specified columns of a table using Selenium.
+
+    Args:
+        driver: The Selenium WebDriver instance.
+        table_selector: The CSS selector for the target table.
+        column_headers: A list of strings representing the desired column headers,
+            or None to extract every column.
+        single_call: Read the whole table with one in-browser script call.
+            The per-cell WebDriver reads are used if this is False or the
+            script fails.
+
+    Returns:
+        A tuple: (actual_headers_found, data)
+        - actual_headers_found: list of headers that were actually found
+        - data: list of lists containing the extracted data
+    """
+    try:
+        table = WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, table_selector))
+        )
+
+        if single_call:
+            snapshot = snapshot_table(driver, table)
+            if snapshot is not None:
+                header_texts, rows = snapshot
+                return select_columns(header_texts, rows, column_headers)
+
+        thead = table.find_element(By.TAG_NAME, 'thead')
+        tbody = table.find_element(By.TAG_NAME, 'tbody')
+
+        header_row = thead.find_element(By.TAG_NAME, 'tr')
+        ths = header_row.find_elements(By.TAG_NAME, 'th')
+        header_texts = [th.text.strip() for th in ths]
+        
+        print(f"Available headers in table: {header_texts}")
+        if column_headers is None:
+            column_headers = header_texts
+
+        column_indexes = []
+        actual_headers_found = []
+        
+        for header in column_headers:
+            try:
+                index = header_texts.index(header)
+                column_indexes.append(index)
+                actual_headers_found.append(header)
+            except ValueError:
+                print(f"Warning: Header '{header}' not found in the table.")
+                # If a header is not found, we'll skip it in the extraction
+
+        if not column_indexes:
+            print("No matching headers found. Cannot extract data.")
+            return [], []
+
+        print(f"Found {len(actual_headers_found)} matching headers: {actual_headers_found}")
+
+        data = []
+        rows = tbody.find_elements(By.TAG_NAME, 'tr')
+        for row in rows:
+            cells = row.find_elements(By.TAG_NAME, 'td')
+            row_data = []
+            for index in column_indexes:
+                 if index < len(cells):
+                    row_data.append(cells[index].text.strip())
+                 else:
+                    row_data.append("") # Add empty string if cell index is out of bounds
+            data.append(row_data)
+
+        return actual_headers_found, data
+
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return [], []
+
+class LakeLevelScraper:
+    def __init__(self, excel_file_path, output_file_path="lake_level_data.xlsx", backend="selenium",
+                 cache_path=None, cache_only=False, store_path=None, export_formats=None,
+                 requests_per_second=0.5, metrics_path=None, profile_dir=None,
+                 headless=True, browser_profile="full", projection="full", date_range=None,
+                 segregated_path=None, split_output=None, split_into="sheets", analytics=False):
+        """
+        Initialize the scraper
+        
+        Every date is scraped once with all of its columns and committed to
+        the store. The output only has the columns of the projection, and
+        other projections can be exported from the same store later with
+        materialize().
+        
+        Args:
+            excel_file_path (str): Path to Excel or CSV file containing dates
+            output_file_path (str): Path for output Excel (or CSV) file
+            backend (str): "selenium" to load every page in Chrome, or "http"
+                to fetch the server-rendered HTML directly and only open
+                Chrome for dates whose table is missing from that HTML
+            cache_path (str): Optional SQLite file for the on-disk page cache.
+                Cached dates are served without touching the network.
+            cache_only (bool): Only serve dates from the cache, never fetch
+            store_path (str): SQLite file that every scraped date is committed
+                to as the run goes. Defaults to the output path with a
+                .sqlite extension.
+            export_formats (list): Typed copies of the output to write next
+                to the Excel file, "parquet" and/or "feather"
+            requests_per_second (float): Request budget shared by all
+                workers. Cached dates do not use it.
+            metrics_path (str): Optional JSON lines file that every stage
+                timing (navigate, wait, extract, transform, write) is appended
+                to. A Prometheus text snapshot is written next to it at the
+                end of each run.
+            profile_dir (str): Optional directory for a cProfile dump of
+                every scrape_all_dates run
+            headless (bool): Run Chrome without a window
+            browser_profile (str): "full" loads pages like a normal browser.
+                "lean" uses the eager page-load strategy and blocks images,
+                media, fonts and trackers, so pages load faster and with
+                fewer bytes. The extracted table is the same.
+            projection: Columns written to the output: "full", "level"
+                (RESERVOIR and Level) or a list of headers
+            date_range (DateRange): Dates to scrape instead of the ones in
+                excel_file_path, generated as they are needed
+            segregated_path (str): Optional CSV with every stored reading
+                grouped by reservoir and in date order within each (the
+                layout of Reservoir-wise_Segregated_Data_by_Date.csv),
+                rewritten after every run that committed new dates
+            split_output (str): Split the output per "reservoir" or per
+                "year". The output is streamed either way, with flat memory
+                use however many rows there are.
+            split_into (str): Put the parts on "sheets" of one workbook or
+                in separate "files" (<output>_<part>.xlsx). CSV outputs are
+                always split into files.
+            analytics (bool): Keep rolling 7/30-day aggregates, year-over-year
+                deltas and system-wide totals materialized in the store,
+                updated for the new dates after every run (see analytics.py)
+        """
+        if browser_profile not in BROWSER_PROFILES:
+            raise ValueError(f"Unknown browser profile: {browser_profile}")
+        if split_output is not None and split_output not in SPLITS:
+            raise ValueError(f"Unknown output split: {split_output}")
+        if split_into not in SPLIT_INTO:
+            raise ValueError(f"Unknown split_into: {split_into}")
+
+        self.excel_file_path = excel_file_path
+        self.date_range = date_range
+        self.output_file_path = output_file_path
+        self.base_url = "https://cmwssb.tn.gov.in/lake-level?date="
+        self.backend = backend
+        self.headless = headless
+        self.browser_profile = browser_profile
+        # Warm browsers shared by every call, see __enter__
+        self.browsers = BrowserSession(lambda: self.create_driver())
+        self.http_session = create_http_session() if backend == "http" else None
+        # Lets only one HTTP fallback at a time borrow a browser
+        self.browser_lock = threading.Lock()
+        self.cache = PageCache(cache_path) if cache_path else None
+        self.cache_only = cache_only
+        self.store = ResultStore(store_path or os.path.splitext(output_file_path)[0] + ".sqlite")
+        self.export_formats = list(export_formats or [])
+        self.segregated_path = segregated_path
+        self.split_output = split_output
+        self.split_into = split_into
+        self.analytics = ReservoirAnalytics(self.store) if analytics else None
+        
+        # Politeness budget shared by all workers, and retries for failed dates
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.max_attempts = 3
+        self.retry_base_delay = 2.0
+        self.retry_max_delay = 60.0
+        self.status = run_status.DateStatusBoard()
+        
+        # Per-stage timings, and an opt-in profile of every run
+        self.metrics = StageMetrics(metrics_path, {"backend": backend})
+        self.profiler = RunProfiler(profile_dir) if profile_dir else None
+        
+        # How long to wait for the table or the site's no-data message
+        self.page_timeout = 10
+        self.no_data_texts = list(NO_DATA_TEXTS)
+        
+        # Table selector and the headers of the output projection
+        self.table_selector = "table.lack-view.table.table-responsive.table-striped.table-bordered"
+        self.projection = projection
+        self.desired_headers = resolve_projection(projection)
+        
+    def create_driver(self):
+        """Create a new Chrome driver with the scraper's options"""
+        chrome_options = Options()
+        if self.headless:
+            chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--window-size=1920,1080")
+        if self.browser_profile == LEAN:
+            apply_lean_options(chrome_options)
+        
+        # ChromeDriver is resolved once and its path cached, so this works offline
+        driver = start_chrome(chrome_options)
+        if self.browser_profile == LEAN:
+            block_requests(driver)
+        # No implicit wait: readiness is detected explicitly, and an implicit
+        # wait would add its delay to every lookup on a page without a table
+        driver.implicitly_wait(0)
+        return driver
+
+    def __enter__(self):
+        """Keep the browsers warm across calls until the with-block ends"""
+        self.browsers.__enter__()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.browsers.__exit__(exc_type, exc, tb)
+        
+    def read_dates_from_excel(self):
+        """Read dates from the Excel (or CSV) file and extract only date part (ignore time)"""
+        try:
+            # The whole first column is parsed at once, bad rows are reported together
+            dates, invalid = read_date_file(self.excel_file_path)
+        except Exception as e:
+            print(f"Error reading dates file: {e}")
+            return []
+        
+        report_invalid_dates(invalid)
+        print(f"Found {len(dates)} dates (including duplicates)")
+        return dates
+    
+    def read_input_dates(self):
+        """The dates to scrape: the date range if one was given, otherwise the dates file"""
+        if self.date_range is not None:
+            print(f"Using {len(self.date_range)} dates from {self.date_range}")
+            return self.date_range
+        return self.read_dates_from_excel()
+
+    
+    def extract_data_for_date(self, date_str, driver=None):
+        """
+        Extract data for a specific date
+
+        Args:
+            date_str (str): Date in DD-MM-YYYY format
+            driver: WebDriver to use instead of one borrowed from self.browsers
+                (used by pool workers)
+
+        Returns:
+            A tuple: (table_headers, rows) with every column of the table
+            and the date appended to each row, or ([], []) if the date has
+            no data or none of the desired headers is in the table
+        """
+        started = time.perf_counter()
+        try:
+            url = f"{self.base_url}{date_str}"
+            print(f"Scraping data for date: {date_str}")
+            
+            # Serve the full table from the cache when we have it
+            with self.metrics.span("cache", date_str):
+                table = self.cache.get(date_str, self.table_selector) if self.cache else None
+            if table is None:
+                if self.cache_only:
+                    print(f"Cache-only mode: {date_str} is not cached")
+                    self.status.record(date_str, run_status.NOT_CACHED)
+                    return [], []
+                
+                table = self.fetch_table(date_str, url, driver)
+                # Only tables with rows are cached; confirmed empty dates are cached in record_failure
+                if self.cache and table[1]:
+                    self.cache.put(date_str, self.table_selector, *table)
+            elif not table[0]:
+                print(f"No data published for date: {date_str} (cached)")
+                self.status.record(date_str, run_status.NO_DATA, "cached")
+                return [], []
+            
+            return self.table_to_rows(date_str, table)
+                
+        except Exception as e:
+            self.record_failure(date_str, e)
+            return [], []
+        finally:
+            self.metrics.record("date", time.perf_counter() - started, date_str)
+    
+    def table_to_rows(self, date_str, table):
+        """
+        Add the date to every row of a fetched table and record the outcome
+        
+        Returns:
+            A tuple: (table_headers, rows), or ([], []) if the table has no
+            rows or none of the desired headers
+        """
+        with self.metrics.span("transform", date_str):
+            table_headers, rows = table
+            # The whole table is kept; it only has to contain the projection
+            actual_headers, _ = column_layout(tuple(table_headers), tuple(self.desired_headers))
+            width = len(table_headers)
+            # Pad short rows so the date always lands in the Date column
+            extracted_data = [
+                (list(row) + [""] * width)[:width] + [date_str] for row in rows
+            ] if actual_headers else []
+        
+        if extracted_data:
+            self.status.record(date_str, run_status.OK)
+            return list(table_headers), extracted_data
+        elif table[0]:
+            print(f"No data found for date: {date_str}")
+            self.status.record(date_str, run_status.EMPTY)
+            return [], []
+        else:
+            # The table could not be read at all, worth another attempt
+            print(f"No data found for date: {date_str}")
+            self.status.record(date_str, run_status.ERROR, "table could not be read")
+            return [], []
+    
+    def record_failure(self, date_str, error):
+        """Record why fetching a date failed"""
+        if isinstance(error, NoDataForDate):
+            # Remember confirmed-empty dates so the next run does not retry them
+            print(f"No data published for date: {date_str}")
+            if self.cache:
+                self.cache.put(date_str, self.table_selector, [], [])
+            self.status.record(date_str, run_status.NO_DATA)
+        elif isinstance(error, TimeoutException):
+            print(f"Timeout waiting for page to load for date: {date_str}")
+            self.status.record(date_str, run_status.TIMEOUT)
+        else:
+            print(f"Error extracting data for date {date_str}: {error}")
+            self.status.record(date_str, run_status.ERROR, str(error) or type(error).__name__)
+    
+    def fetch_table(self, date_str, url, driver=None):
+        """
+        Fetch the full table (all headers and rows) for a date from the site
+        
+        Returns:
+            A tuple: (header_texts, rows), empty lists if nothing was found
+        
+        Raises:
+            NoDataForDate: If the site confirms nothing is published for the date
+            requests.RequestException: If the http backend could not fetch the
+                page; the date is recorded as an error and retried
+        """
+        with self.metrics.span("throttle", date_str):
+            self.rate_limiter.acquire()
+        if self.backend == "http":
+            table = fetch_table_http(self.http_session, url, self.table_selector,
+                                     no_data_texts=self.no_data_texts, metrics=self.metrics, date_str=date_str)
+            if table is not None:
+                return table
+            print(f"Table rows not in server HTML for {date_str}, falling back to the browser")
+            with self.metrics.span("throttle", date_str):
+                self.rate_limiter.acquire()
+        
+        return self.read_table_with_browser(url, driver, date_str)
+    
+    def read_table_with_browser(self, url, driver=None, date_str=None):
+        """
+        Load a page in Chrome and extract the full table from it
+        
+        Args:
+            url (str): Page URL to load
+            driver: WebDriver to use. Without one a browser is borrowed from
+                self.browsers, and started first if needed.
+            date_str (str): Date the stage timings are recorded under
+        """
+        if driver is None:
+            with self.browser_lock:
+                driver = self.browsers.acquire()
+                try:
+                    return self.read_table_with_browser(url, driver, date_str)
+                finally:
+                    self.browsers.release(driver)
+        
+        # Navigate to the URL
+        with self.metrics.span("navigate", date_str):
+            driver.get(url)
+        
+        # Return as soon as the table or the no-data message shows up
+        with self.metrics.span("wait", date_str):
+            state = wait_for_page_state(driver, self.table_selector, self.no_data_texts, self.page_timeout)
+        if state == NO_DATA:
+            raise NoDataForDate(url)
+        
+        # Bytes per page, to compare browser profiles
+        size = page_transfer_bytes(driver)
+        if size is not None:
+            self.metrics.record_bytes(size, date_str)
+        
+        # Extract every column, the desired ones are selected afterwards
+        with self.metrics.span("extract", date_str):
+            return extract_table_data(driver, self.table_selector, None)
+    
+    def scrape_all_dates(self, workers=1, incremental=True):
+        """
+        Scrape data for all dates in the Excel file
+        
+        Each unique date is fetched once and its full table committed to
+        the result store as soon as it is scraped. The Excel file is exported from the store
+        at the end, with a date's rows repeated for every occurrence of that
+        date in the Excel input.
+        
+        Requests are paced by the shared rate limiter, failed dates are
+        retried with exponential backoff, and the run ends with a per-date
+        status report (also saved next to the output as *_status.csv).
+        
+        Args:
+            workers (int): Number of browser sessions to run in parallel.
+                The dates are shared out through a queue and the output is
+                exported in the input's date order.
+            incremental (bool): Skip dates already committed to the store
+                (or present in the existing output file) and keep their rows
+        """
+        dates, pending = self.plan_run(incremental)
+        if not dates:
+            return
+        
+        final_headers = None
+        retry_queue = RetryQueue(self.retry_base_delay, self.retry_max_delay)
+        
+        profiling = self.profiler.profile_thread() if self.profiler else contextlib.nullcontext()
+        try:
+            with profiling:
+                results = scrape_dates_in_pool(self, pending, workers, self.max_attempts, retry_queue)
+                
+                for date_str, (actual_headers, date_data) in results:
+                    if date_data and actual_headers:
+                        # Set the output headers from the first successful extraction
+                        if final_headers is None:
+                            final_headers = self.output_headers(actual_headers)
+                        
+                        # Checkpoint this date before moving on
+                        self.commit_result(date_str, actual_headers, date_data)
+                    else:
+                        print(f"  No data found for {date_str}")
+                
+                self.export_results(dates, final_headers)
+                    
+        except KeyboardInterrupt:
+            print("Scraping interrupted by user")
+            print(f"Scraped dates are saved in {self.store.path}, run again to resume")
+        except Exception as e:
+            print(f"Error during scraping: {e}")
+        finally:
+            self.finish_run()
+    
+    async def scrape_all_dates_async(self, fetch_concurrency=4, parse_concurrency=2, sink_concurrency=1,
+                                     queue_size=16, incremental=True):
+        """
+        Scrape data for all dates in the Excel file with the asyncio pipeline
+        
+        Works like scrape_all_dates, but fetching, parsing and saving run as
+        separate stages connected by bounded queues (see async_pipeline.py),
+        so pages are downloaded while earlier ones are parsed and committed.
+        Cancelling the task (Ctrl+C under asyncio.run) stops fetching, saves
+        every date that was already parsed and re-raises the cancellation.
+        
+        Args:
+            fetch_concurrency (int): Pages fetched at the same time; with the
+                selenium backend, the number of browsers
+            parse_concurrency (int): Pages parsed at the same time
+            sink_concurrency (int): Dates committed to the store at the same time
+            queue_size (int): Items each queue holds before the stage in
+                front of it waits
+            incremental (bool): Skip dates already committed to the store
+        """
+        dates, pending = self.plan_run(incremental)
+        if not dates:
+            return
+        
+        profiling = self.profiler.profile_thread() if self.profiler else contextlib.nullcontext()
+        try:
+            with profiling:
+                final_headers = await run_pipeline(self, pending, fetch_concurrency, parse_concurrency,
+                                                   sink_concurrency, queue_size)
+            self.export_results(dates, final_headers and self.output_headers(final_headers))
+        except asyncio.CancelledError:
+            print("Scraping interrupted by user")
+            print(f"Scraped dates are saved in {self.store.path}, run again to resume")
+            raise
+        except Exception as e:
+            print(f"Error during scraping: {e}")
+        finally:
+            self.finish_run()
+    
+    def scrape_leased_dates(self, board_path, workers=1, chunk_size=10, lease_seconds=300, poll_seconds=5.0):
+        """
+        Scrape the dates in the Excel file together with other worker processes
+        
+        Every worker runs this with the same board file and result store.
+        The dates not yet in the store are put on the shared work board in
+        chunks of consecutive dates; each worker leases one chunk at a time,
+        scrapes it with its own pool and renews the lease after every date.
+        A chunk whose worker crashed is taken over once its lease expires,
+        so lease_seconds should be well above the time one date can take,
+        retries included. Dates are committed per date, so a chunk scraped
+        twice still leaves one copy of every date in the store.
+        
+        The worker that finishes the last chunk exports the output.
+        
+        Args:
+            board_path (str): SQLite work board shared by all workers
+            workers (int): Browser sessions of this process
+            chunk_size (int): Consecutive dates per lease
+            lease_seconds (float): How long a lease lasts without renewal
+            poll_seconds (float): Longest wait between checks for expired
+                leases once no chunk is free
+        """
+        dates, pending = self.plan_run(incremental=True)
+        if not dates:
+            return
+        
+        board = WorkBoard(board_path, lease_seconds)
+        added = board.add_dates(pending, chunk_size)
+        print(f"Worker {board.worker_id}: {added} dates added to the work board {board_path}")
+        
+        final_headers = None
+        profiling = self.profiler.profile_thread() if self.profiler else contextlib.nullcontext()
+        try:
+            with profiling:
+                while True:
+                    lease = board.lease()
+                    if lease is None:
+                        wait = board.seconds_until_takeover()
+                        if wait is None:
+                            break
+                        # Other workers hold the remaining chunks, take them over if they stall
+                        time.sleep(min(max(wait, 0.1), poll_seconds))
+                        continue
+                    
+                    chunk_id, chunk_dates = lease
+                    print(f"Leased chunk {chunk_id}: {len(chunk_dates)} dates, {chunk_dates[0]} to {chunk_dates[-1]}")
+                    retry_queue = RetryQueue(self.retry_base_delay, self.retry_max_delay)
+                    results = scrape_dates_in_pool(self, chunk_dates, workers, self.max_attempts, retry_queue)
+                    try:
+                        for date_str, (actual_headers, date_data) in results:
+                            if date_data and actual_headers:
+                                if final_headers is None:
+                                    final_headers = self.output_headers(actual_headers)
+                                self.commit_result(date_str, actual_headers, date_data)
+                            else:
+                                print(f"  No data found for {date_str}")
+                            
+                            if not board.renew(chunk_id):
+                                print(f"Lost the lease on chunk {chunk_id}, another worker took it over")
+                                break
+                        else:
+                            board.complete(chunk_id)
+                    finally:
+                        results.close()
+                
+                print(f"Work board progress: {board.progress()}")
+                if board.claim_export():
+                    self.export_results(dates, final_headers)
+                else:
+                    print("Output is exported by the worker that finishes last")
+                    
+        except KeyboardInterrupt:
+            released = board.release()
+            print("Scraping interrupted by user")
+            print(f"{released} leased chunks handed back, scraped dates are saved in {self.store.path}")
+        except Exception as e:
+            print(f"Error during scraping: {e}")
+        finally:
+            board.close()
+            self.finish_run()
+    
+    def refresh_recent(self, days=7, end=None, workers=1, changelog_path=None, export=False):
+        """
+        Re-check the most recent dates for revisions
+        
+        Every date of the last `days` days (up to `end`) that is in the input
+        or already stored is scraped again, past the page cache. Tables whose
+        content hash did not change are left alone; for the others only the
+        changed rows are rewritten and every revised value is appended to the
+        changelog, so downstream consumers can reprocess just the deltas.
+        
+        Args:
+            days (int): Size of the window in days
+            end (str): Last date of the window (DD-MM-YYYY), default today
+            workers (int): Browser sessions to run in parallel
+            changelog_path (str): JSON lines file the revised values are
+                appended to. Defaults to the output path with a
+                _changes.jsonl suffix.
+            export (bool): Export the output again if anything changed
+        
+        Returns:
+            The list of revised values, see result_store.table_changes()
+        """
+        last_day = datetime.strptime(end, "%d-%m-%Y") if end else datetime.now()
+        window = DateRange(last_day - timedelta(days=days - 1), last_day)
+        known = set(self.read_input_dates()) | self.store.committed_dates()
+        dates = [date_str for date_str in window if date_str in known]
+        if not dates:
+            print(f"No input or stored dates in {window}")
+            return []
+        
+        print(f"Refreshing {len(dates)} dates from {dates[0]} to {dates[-1]}")
+        if self.cache:
+            for date_str in dates:
+                self.cache.discard(date_str, self.table_selector)
+        changelog_path = changelog_path or os.path.splitext(self.output_file_path)[0] + "_changes.jsonl"
+        
+        self.status = run_status.DateStatusBoard()
+        states = {}
+        revisions = []
+        retry_queue = RetryQueue(self.retry_base_delay, self.retry_max_delay)
+        try:
+            results = scrape_dates_in_pool(self, dates, workers, self.max_attempts, retry_queue)
+            for date_str, (table_headers, rows) in results:
+                if not rows:
+                    print(f"  No data found for {date_str}")
+                    continue
+                
+                with self.metrics.span("write", date_str):
+                    state, changes = self.store.refresh_date(date_str, table_headers + ["Date"], rows)
+                states[state] = states.get(state, 0) + 1
+                if changes:
+                    print(f"  {date_str}: {len(changes)} values revised")
+                    detected_at = datetime.now().isoformat(timespec="seconds")
+                    with open(changelog_path, "a") as handle:
+                        for change in changes:
+                            handle.write(json.dumps({**change, "detected_at": detected_at}) + "\n")
+                    revisions.extend(changes)
+            
+            print(f"Refresh finished: {', '.join(f'{count} {state}' for state, count in sorted(states.items()))}")
+            if revisions:
+                print(f"{len(revisions)} revised values appended to {changelog_path}")
+            if export and (revisions or states.get("new")):
+                self.export_results(self.read_input_dates())
+            else:
+                self.update_analytics()
+                
+        except KeyboardInterrupt:
+            print("Refresh interrupted by user")
+        except Exception as e:
+            print(f"Error during refresh: {e}")
+        finally:
+            self.finish_run()
+        return revisions
+    
+    def plan_run(self, incremental=True):
+        """
+        Read the input dates and pick the ones to scrape in this run
+        
+        Returns:
+            A tuple: (dates, pending) with every input date in order (a
+            DateRange is kept as it is) and the unique dates still to
+            scrape. dates is empty if there is no input.
+        """
+        # Read dates from the input file or range
+        dates = self.read_input_dates()
+        
+        if not dates:
+            print("No valid dates found in Excel file")
+            return [], []
+        
+        # Resume from the store and fetch each remaining date once
+        done_dates = set()
+        if incremental:
+            done_dates = self.resume_from_previous_run()
+        pending = plan_dates(dates, done_dates)
+        print(f"Found {len(dates)} dates, {len(pending)} unique dates left to scrape")
+        
+        self.status = run_status.DateStatusBoard()
+        return dates, pending
+    
+    def output_headers(self, table_headers):
+        """Output columns for a table layout: the projection's headers it has, and Date"""
+        found, _ = column_layout(tuple(table_headers), tuple(self.desired_headers))
+        return list(found) + ["Date"]
+    
+    def commit_result(self, date_str, table_headers, rows):
+        """Checkpoint one scraped date in the store"""
+        with self.metrics.span("write", date_str):
+            self.store.commit_date(date_str, table_headers + ["Date"], rows)
+        print(f"  Found {len(rows)} reservoir records for {date_str}")
+    
+    def export_results(self, dates, final_headers=None):
+        """Export the output file (and typed copies and the segregated CSV) from the store"""
+        headers = final_headers or self.projection_headers(self.desired_headers)
+        with self.metrics.span("write"):
+            summary = self.store.export(self.output_file_path, dates, headers, self.split_output, self.split_into)
+            typed_paths = self.export_typed_copies(self.output_file_path, dates, headers) if summary else []
+            segregated_rows = self.store.export_segregated(self.segregated_path) if self.segregated_path else None
+        self.update_analytics()
+        if summary is not None:
+            print()
+            for path in summary["paths"]:
+                print(f"Data saved to {path}")
+            for path in typed_paths:
+                print(f"Typed data saved to {path}")
+            if segregated_rows is not None:
+                print(f"Reservoir-wise data saved to {self.segregated_path} ({segregated_rows} rows)")
+            print(f"Total records: {summary['rows']}")
+            
+            # Print summary
+            print("\nSummary:")
+            print(f"Unique dates processed: {summary['dates']}")
+            print(f"Total reservoir records: {summary['rows']}")
+            print(f"Columns extracted: {headers}")
+            
+        else:
+            print("No data was successfully extracted")
+        return summary
+    
+    def update_analytics(self):
+        """Take newly committed dates into the materialized aggregates"""
+        if self.analytics is None:
+            return
+        with self.metrics.span("analytics"):
+            taken = self.analytics.update()
+        if taken:
+            print(f"Aggregates updated for {taken} new or revised dates")
+    
+    def export_typed_copies(self, output_file_path, dates, headers):
+        """Typed Parquet/Feather copies, streamed from the store in typed batches"""
+        if not self.export_formats:
+            return []
+        return export_typed(self.store.iter_rows(dates, headers), headers, output_file_path, self.export_formats)
+    
+    def finish_run(self):
+        """Close the browsers (unless kept warm) and report the run"""
+        if self.browsers.done():
+            print("Browser closed")
+        counts = self.status.report(os.path.splitext(self.output_file_path)[0] + "_status.csv")
+        self.report_metrics(counts)
+    
+    def report_metrics(self, status_counts=None):
+        """
+        Print the per-stage timings of the run and write the metrics files
+        
+        The Prometheus snapshot goes next to the JSON lines file (same name
+        with a .prom extension), and the run's profile to profile_dir.
+        """
+        summary = self.metrics.summary()
+        if summary:
+            print("\nStage timings:")
+            for stage, entry in summary.items():
+                print(f"  {stage}: {entry['count']} spans, {entry['total']}s total, {entry['mean']}s mean")
+        bytes_per_page = self.metrics.bytes_per_page()
+        if bytes_per_page is not None:
+            print(f"  {bytes_per_page / 1024:.1f} KB transferred per page")
+        
+        if self.metrics.jsonl_path:
+            prom_path = os.path.splitext(self.metrics.jsonl_path)[0] + ".prom"
+            self.metrics.write_prometheus(prom_path, status_counts)
+            print(f"Metrics saved to {self.metrics.jsonl_path} and {prom_path}")
+        
+        if self.profiler:
+            profile_path = self.profiler.dump()
+            if profile_path:
+                print(f"Profile saved to {profile_path}")
+    
+    def projection_headers(self, desired_headers):
+        """Output columns for the stored layouts: the desired headers the portal served, and Date"""
+        # Headers the portal never served are left out, like in scrape_all_dates
+        stored = set(self.store.stored_headers())
+        return [header for header in desired_headers if header in stored] + ["Date"]
+    
+    def resume_from_previous_run(self):
+        """
+        Find the dates that do not need scraping again
+        
+        Rows from an existing output file that are not in the store yet are
+        committed to it first, so older runs are picked up as well.
+        
+        Every stored date counts, whatever columns the portal served for it:
+        dates are stored with their whole table, and headers it lacks are
+        exported as empty cells.
+        
+        Returns:
+            A set of dates already committed
+        """
+        committed = self.store.committed_dates()
+        headers, rows_by_date = load_existing_rows(self.output_file_path, self.desired_headers)
+        for date_str, rows in rows_by_date.items():
+            if date_str not in committed:
+                self.store.commit_date(date_str, headers, rows)
+        
+        done_dates = self.store.committed_dates()
+        if done_dates:
+            print(f"Resuming: {len(done_dates)} dates already saved in {self.store.path}")
+        return done_dates
+    
+    def materialize(self, projection, output_file_path, dates=None):
+        """
+        Export a projection of the stored tables without scraping again
+        
+        Args:
+            projection: "full", "level" or a list of headers
+            output_file_path (str): Excel or CSV file to write, split like
+                the main output; typed copies in export_formats are written
+                next to it
+            dates (list): Dates in output order, duplicates repeated. Defaults
+                to every stored date in date order.
+        
+        Returns:
+            The export summary (rows, dates and paths written), or None if
+            nothing was stored
+        """
+        headers = self.projection_headers(resolve_projection(projection))
+        
+        with self.metrics.span("write"):
+            summary = self.store.export(output_file_path, dates or [], headers, self.split_output, self.split_into)
+            typed_paths = self.export_typed_copies(output_file_path, dates or [], headers) if summary else []
+        if summary is None:
+            print(f"Nothing stored for projection {projection}")
+            return None
+        
+        print(f"Projection {projection} saved to {', '.join(summary['paths'])} ({summary['rows']} records)")
+        for path in typed_paths:
+            print(f"Typed data saved to {path}")
+        return summary
+    
+    def scrape_single_date(self, date_str):
+        """Scrape data for a single date (for testing)"""
+        try:
+            table_headers, table_data = self.extract_data_for_date(date_str)
+            headers, data = select_columns(table_headers + ["Date"], table_data, self.desired_headers + ["Date"])
+            if data and headers:
+                df = pd.DataFrame(data, columns=headers)
+                print(f"\nData for {date_str}:")
+                print(df.to_string(index=False))
+                print(f"\nColumns found: {headers}")
+                return df
+            else:
+                print(f"No data found for {date_str}")
+                return None
+        finally:
+            self.browsers.done()
+
+def main(excel_file_path="datesn.xlsx", output_file_path="lake_level_extract.xlsx", projection="full",
+         extra_outputs=None):
+    """
+    Main function to run the scraper
+    
+    Args:
+        excel_file_path (str): Excel or CSV file with the dates in the first column
+        output_file_path (str): Excel file for the scraped projection
+        projection: Columns of the output, "full", "level" or a list of headers
+        extra_outputs (dict): More outputs exported from the same scrape,
+            mapping an output path to its projection
+    """
+    
+    # Configuration
+    workers = 1  # Number of browser sessions to run in parallel
+    use_pipeline = False  # True for the asyncio fetch/parse/write pipeline, with `workers` fetchers
+    backend = "selenium"  # Or "http" to skip Chrome when the table is in the page HTML
+    cache_path = "lake_level_cache.sqlite"  # Set to None to disable the page cache
+    export_formats = []  # Add "parquet" or "feather" for typed copies of the output
+    requests_per_second = 0.5  # Request budget shared by all workers
+    metrics_path = None  # e.g. "lake_level_metrics.jsonl" for per-stage timings
+    profile_dir = None  # e.g. "profiles" for a cProfile dump of every run
+    headless = True  # Set to False to watch the browser
+    browser_profile = "lean"  # Or "full" to also load images, media and fonts
+    date_range = None  # e.g. DateRange("01-01-2015", "31-12-2024") instead of the dates file
+    segregated_path = "lake_level_segregated.csv"  # Every reading grouped by reservoir, None to skip
+    split_output = None  # "reservoir" or "year" to split the output into parts
+    split_into = "sheets"  # Or "files" for one file per part
+    analytics = True  # Rolling 7/30-day aggregates and system totals kept in the store
+    if extra_outputs is None:
+        extra_outputs = {"lake_level_levels.xlsx": "level"}  # Served from the same scrape
+    
+    # Check if the dates file exists
+    if date_range is None and not os.path.exists(excel_file_path):
+        print(f"Excel file not found: {excel_file_path}")
+        print("Please make sure your Excel file exists and update the path in the script")
+        return
+    
+    # Create scraper instance
+    with LakeLevelScraper(excel_file_path, output_file_path, backend=backend, cache_path=cache_path,
+                          export_formats=export_formats, requests_per_second=requests_per_second,
+                          metrics_path=metrics_path, profile_dir=profile_dir,
+                          headless=headless, browser_profile=browser_profile,
+                          projection=projection, date_range=date_range,
+                          segregated_path=segregated_path, split_output=split_output,
+                          split_into=split_into, analytics=analytics) as scraper:
+        # Option 1: Test with single date first (its browser is reused below)
+        print("Testing with single date first...")
+        test_date = "04-08-2023"
+        result = scraper.scrape_single_date(test_date)
+        
+        if result is not None:
+            print(f"\nTest successful! Found {len(result)} records.")
+            
+            # Option 2: Scrape all dates from Excel
+            print("\nDo you want to proceed with scraping all dates from Excel?")
+            user_input = input("Enter 'y' to continue or 'n' to exit: ")
+            if user_input.lower() == 'y':
+                if use_pipeline:
+                    try:
+                        asyncio.run(scraper.scrape_all_dates_async(fetch_concurrency=workers))
+                    except KeyboardInterrupt:
+                        return
+                else:
+                    scraper.scrape_all_dates(workers=workers)
+                
+                # Other column sets come from the store, nothing is fetched again
+                dates = scraper.read_input_dates()
+                for extra_path, extra_projection in extra_outputs.items():
+                    scraper.materialize(extra_projection, extra_path, dates)
+            else:
+                print("Scraping cancelled")
+        else:
+            print("Test failed. Please check the website and table structure.")
+
+if __name__ == "__main__":
+    main()
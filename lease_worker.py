@@ -0,0 +1,68 @@
+import argparse
+import os
+
+from date_inputs import DateRange
+from lake_level_scraper import LakeLevelScraper
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scrape a dates file or a date range together with other worker processes. "
+                    "Start one worker per process or machine with the same board and store; "
+                    "each leases chunks of dates from the board and commits them to the store."
+    )
+    parser.add_argument("output_file_path", help="Excel file exported once every chunk is done")
+    parser.add_argument("--input", help="Excel or CSV file with the dates in the first column")
+    parser.add_argument("--start", help="first date of a range to scrape instead of --input (DD-MM-YYYY)")
+    parser.add_argument("--end", help="last date of the range (DD-MM-YYYY)")
+    parser.add_argument("--step", type=int, default=1, help="days between the dates of the range")
+    parser.add_argument("--board", help="shared SQLite work board (default: <output>_board.sqlite)")
+    parser.add_argument("--store", help="shared SQLite result store (default: <output>.sqlite)")
+    parser.add_argument("--backend", default="selenium", choices=["selenium", "http"])
+    parser.add_argument("--browser-profile", default="lean", choices=["full", "lean"])
+    parser.add_argument("--projection", default="full", help="columns of the output: full or level")
+    parser.add_argument("--workers", type=int, default=1, help="browser sessions in this process")
+    parser.add_argument("--chunk-size", type=int, default=10, help="consecutive dates per lease")
+    parser.add_argument("--lease-seconds", type=float, default=300, help="lease timeout before takeover")
+    parser.add_argument("--requests-per-second", type=float, default=0.5,
+                        help="request budget of this process; the site sees the sum over all workers")
+    parser.add_argument("--split", choices=["reservoir", "year"], help="split the output into parts")
+    parser.add_argument("--split-into", default="sheets", choices=["sheets", "files"],
+                        help="parts on sheets of one workbook or in separate files")
+    parser.add_argument("--segregated", help="CSV of every reading grouped by reservoir, written with the output")
+    parser.add_argument("--analytics", action="store_true",
+                        help="keep rolling aggregates and system totals up to date in the store")
+    parser.add_argument("--cache", help="SQLite page cache of this worker")
+    parser.add_argument("--base-url", help="page URL without the date, e.g. a local stand-in server")
+    args = parser.parse_args()
+
+    date_range = None
+    if args.start or args.end:
+        if not (args.start and args.end):
+            parser.error("--start and --end go together")
+        try:
+            date_range = DateRange(args.start, args.end, args.step)
+        except ValueError as e:
+            parser.error(str(e))
+    elif not args.input:
+        parser.error("give a dates file with --input or a range with --start and --end")
+    elif not os.path.exists(args.input):
+        print(f"Dates file not found: {args.input}")
+        return
+
+    board_path = args.board or os.path.splitext(args.output_file_path)[0] + "_board.sqlite"
+    with LakeLevelScraper(args.input, args.output_file_path, backend=args.backend,
+                          cache_path=args.cache, store_path=args.store,
+                          requests_per_second=args.requests_per_second,
+                          browser_profile=args.browser_profile, projection=args.projection,
+                          date_range=date_range, segregated_path=args.segregated,
+                          split_output=args.split, split_into=args.split_into,
+                          analytics=args.analytics) as scraper:
+        if args.base_url:
+            scraper.base_url = args.base_url
+        scraper.scrape_leased_dates(board_path, workers=args.workers, chunk_size=args.chunk_size,
+                                    lease_seconds=args.lease_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from datetime import datetime
+
+# Upper bounds (seconds) of the Prometheus histogram buckets
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+
+class StageMetrics:
+    """
+    Thread-safe per-stage timing for a scraper run.
+
+    Every span records how long one stage (navigate, wait, extract,
+    transform, write, ...) took for one date. Spans are kept as running
+    histograms per stage and, when jsonl_path is set, appended to a JSON
+    lines file as they finish.
+    """
+
+    def __init__(self, jsonl_path=None, labels=None):
+        """
+        Args:
+            jsonl_path (str): Optional file that every span is appended to
+            labels (dict): Extra fields written with every span, for example
+                {"backend": "http"}
+        """
+        self.jsonl_path = jsonl_path
+        self.labels = dict(labels or {})
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.pages = 0
+        self.page_bytes = 0
+        self.handle = open(jsonl_path, "a") if jsonl_path else None
+
+    @contextlib.contextmanager
+    def span(self, stage, date_str=None):
+        """Time the body of a with-block as one span of `stage`"""
+        started = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - started, date_str, ok)
+
+    def record(self, stage, seconds, date_str=None, ok=True):
+        """Add one finished span"""
+        with self.lock:
+            entry = self.stages.setdefault(stage, {"count": 0, "sum": 0.0, "buckets": [0] * len(BUCKETS)})
+            entry["count"] += 1
+            entry["sum"] += seconds
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    entry["buckets"][i] += 1
+
+            self.write_line({"stage": stage, "date": date_str, "seconds": round(seconds, 6), "ok": ok})
+
+    def record_bytes(self, size, date_str=None):
+        """Add the bytes transferred for one page"""
+        with self.lock:
+            self.pages += 1
+            self.page_bytes += size
+            self.write_line({"stage": "page", "date": date_str, "bytes": size})
+
+    def bytes_per_page(self):
+        """Mean bytes transferred per measured page, or None if none was measured"""
+        with self.lock:
+            return self.page_bytes / self.pages if self.pages else None
+
+    def write_line(self, fields):
+        # Called with self.lock held
+        if self.handle:
+            self.handle.write(json.dumps({"ts": round(time.time(), 3), **fields, **self.labels}) + "\n")
+            self.handle.flush()
+
+    def summary(self):
+        """Per-stage count, total and mean seconds"""
+        with self.lock:
+            return {
+                stage: {
+                    "count": entry["count"],
+                    "total": round(entry["sum"], 3),
+                    "mean": round(entry["sum"] / entry["count"], 4) if entry["count"] else 0.0,
+                }
+                for stage, entry in self.stages.items()
+            }
+
+    def prometheus_text(self, status_counts=None):
+        """
+        Snapshot of the metrics in the Prometheus text exposition format
+
+        Args:
+            status_counts (dict): Optional per-status date counts to export
+                as lake_level_dates_total
+        """
+        label_text = "".join(f',{key}="{value}"' for key, value in self.labels.items())
+        lines = [
+            "# HELP lake_level_stage_seconds Time spent in each scraper stage per date.",
+            "# TYPE lake_level_stage_seconds histogram",
+        ]
+        with self.lock:
+            for stage, entry in sorted(self.stages.items()):
+                labels = f'stage="{stage}"{label_text}'
+                for bound, count in zip(BUCKETS, entry["buckets"]):
+                    lines.append(f'lake_level_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'lake_level_stage_seconds_bucket{{{labels},le="+Inf"}} {entry["count"]}')
+                lines.append(f"lake_level_stage_seconds_sum{{{labels}}} {entry['sum']:.6f}")
+                lines.append(f"lake_level_stage_seconds_count{{{labels}}} {entry['count']}")
+
+            if self.pages:
+                lines.append("# HELP lake_level_page_bytes_total Bytes transferred for the pages fetched.")
+                lines.append("# TYPE lake_level_page_bytes_total counter")
+                lines.append(f"lake_level_page_bytes_total{{{label_text[1:]}}} {self.page_bytes}")
+                lines.append("# HELP lake_level_pages_total Pages whose transferred bytes were measured.")
+                lines.append("# TYPE lake_level_pages_total counter")
+                lines.append(f"lake_level_pages_total{{{label_text[1:]}}} {self.pages}")
+
+        if status_counts:
+            lines.append("# HELP lake_level_dates_total Dates by final status.")
+            lines.append("# TYPE lake_level_dates_total counter")
+            for status, count in sorted(status_counts.items()):
+                lines.append(f'lake_level_dates_total{{status="{status}"{label_text}}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, status_counts=None):
+        with open(path, "w") as handle:
+            handle.write(self.prometheus_text(status_counts))
+
+    def close(self):
+        with self.lock:
+            if self.handle:
+                self.handle.close()
+                self.handle = None
+
+
+def stage_span(metrics, stage, date_str=None):
+    """metrics.span() for optional metrics, a no-op when metrics is None"""
+    if metrics is None:
+        return contextlib.nullcontext()
+    return metrics.span(stage, date_str)
+
+
+class RunProfiler:
+    """
+    Opt-in cProfile hook that profiles a whole run, worker threads included.
+
+    Before Python 3.12, cProfile only sees the thread it is enabled in, so
+    the main thread and every worker thread get their own profiler; their
+    stats are merged into one file when the run is dumped. From 3.12 on, a
+    profiler sees every thread and only one can be active at a time, so the
+    first profile_thread() block enables one shared profiler and the blocks
+    of other threads just join it.
+    """
+
+    # Python 3.12 moved cProfile onto sys.monitoring, which is process-wide
+    PROCESS_WIDE = sys.version_info >= (3, 12)
+
+    def __init__(self, profile_dir):
+        """
+        Args:
+            profile_dir (str): Directory the per-run .prof files are written to
+        """
+        self.profile_dir = profile_dir
+        self.lock = threading.Lock()
+        self.profiles = []
+        self.shared = None
+        self.shared_users = 0
+
+    @contextlib.contextmanager
+    def profile_thread(self):
+        """Profile the current thread for the duration of a with-block"""
+        if self.PROCESS_WIDE:
+            with self.shared_profile():
+                yield
+            return
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self.lock:
+                self.profiles.append(profile)
+
+    @contextlib.contextmanager
+    def shared_profile(self):
+        """One profiler for every thread, enabled while any block is running"""
+        with self.lock:
+            if self.shared_users == 0:
+                profile = cProfile.Profile()
+                try:
+                    profile.enable()
+                except ValueError as e:
+                    # Another profiler (a debugger, an outer cProfile) is running
+                    print(f"Not profiling this run: {e}")
+                    profile = None
+                self.shared = profile
+            self.shared_users += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.shared_users -= 1
+                if self.shared_users == 0 and self.shared is not None:
+                    self.shared.disable()
+                    self.profiles.append(self.shared)
+                    self.shared = None
+
+    def dump(self):
+        """Merge the collected profiles into one file and return its path"""
+        with self.lock:
+            profiles, self.profiles = self.profiles, []
+        if not profiles:
+            return None
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"run-{datetime.now():%Y%m%d-%H%M%S}.prof")
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+        return path
@@ -0,0 +1,136 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+
+class PageCache:
+    """
+    Compressed on-disk cache of extracted lake-level tables.
+
+    Each entry holds the full table of one page (all headers and all body
+    rows, before column selection) keyed by date string and table selector,
+    stored as zlib-compressed JSON in a SQLite file. Historical dates never
+    expire because their published levels do not change; dates within
+    recent_days of today expire after recent_ttl seconds so revisions are
+    picked up. When the cache grows past max_bytes the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, path, max_bytes=200 * 1024 * 1024, recent_days=7, recent_ttl=6 * 3600):
+        """
+        Open (or create) the cache
+
+        Args:
+            path (str): Path of the SQLite cache file
+            max_bytes (int): Upper bound on the total compressed payload size
+            recent_days (int): Dates this close to today are treated as recent
+            recent_ttl (float): Seconds a recent date stays valid
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.recent_days = recent_days
+        self.recent_ttl = recent_ttl
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                date TEXT NOT NULL,
+                selector TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (date, selector)
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS pages_lru ON pages (accessed_at)")
+        self.connection.commit()
+
+    def is_recent(self, date_str):
+        """Whether a DD-MM-YYYY date is close enough to today to be revised"""
+        try:
+            day = datetime.strptime(date_str, "%d-%m-%Y")
+        except ValueError:
+            return True
+        return day >= datetime.now() - timedelta(days=self.recent_days)
+
+    def get(self, date_str, table_selector):
+        """
+        Look up a cached table
+
+        Returns:
+            A tuple: (header_texts, rows), or None on a miss or expired entry.
+            ([], []) marks a date confirmed to have no data.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT payload, fetched_at FROM pages WHERE date = ? AND selector = ?",
+                (date_str, table_selector),
+            ).fetchone()
+            if row is None:
+                return None
+
+            payload, fetched_at = row
+            if self.is_recent(date_str) and time.time() - fetched_at > self.recent_ttl:
+                self.connection.execute(
+                    "DELETE FROM pages WHERE date = ? AND selector = ?", (date_str, table_selector)
+                )
+                self.connection.commit()
+                return None
+
+            self.connection.execute(
+                "UPDATE pages SET accessed_at = ? WHERE date = ? AND selector = ?",
+                (time.time(), date_str, table_selector),
+            )
+            self.connection.commit()
+
+        header_texts, rows = json.loads(zlib.decompress(payload).decode("utf-8"))
+        if header_texts and not rows:
+            # A table read before its rows loaded, cached by older versions
+            self.discard(date_str, table_selector)
+            return None
+        return header_texts, rows
+
+    def put(self, date_str, table_selector, header_texts, rows):
+        """Store the full table for a date and evict old entries if over budget"""
+        payload = zlib.compress(json.dumps([header_texts, rows]).encode("utf-8"))
+        now = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (date_str, table_selector, payload, len(payload), now, now),
+            )
+            self.evict()
+            self.connection.commit()
+
+    def discard(self, date_str, table_selector):
+        """Drop a cached table so the next lookup fetches the page again"""
+        with self.lock:
+            self.connection.execute(
+                "DELETE FROM pages WHERE date = ? AND selector = ?", (date_str, table_selector)
+            )
+            self.connection.commit()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        cursor = self.connection.execute("SELECT date, selector, size FROM pages ORDER BY accessed_at")
+        doomed = []
+        for date_str, table_selector, size in cursor:
+            if total <= self.max_bytes:
+                break
+            doomed.append((date_str, table_selector))
+            total -= size
+        self.connection.executemany("DELETE FROM pages WHERE date = ? AND selector = ?", doomed)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
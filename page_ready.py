@@ -0,0 +1,70 @@
+from selenium.webdriver.support.ui import WebDriverWait
+
+TABLE_READY = "table"
+NO_DATA = "no_data"
+
+# Texts the portal shows instead of the table when nothing is published for a date
+NO_DATA_TEXTS = [
+    "No data found",
+    "No data available",
+    "No records found",
+    "Data not available",
+]
+
+# Returns "table" once the table has a body cell, "no_data" once the page has
+# finished loading and shows one of the no-data texts, otherwise null. A table
+# without body cells may still be filled in by a script, so it is waited on.
+PAGE_STATE_SCRIPT = """
+var selector = arguments[0];
+var markers = arguments[1];
+var table = document.querySelector(selector);
+if (table && table.querySelector('tbody td')) {
+    return 'table';
+}
+if (document.readyState !== 'loading' && document.body) {
+    var text = (document.body.innerText || '').toLowerCase();
+    for (var i = 0; i < markers.length; i++) {
+        if (text.indexOf(markers[i]) !== -1) {
+            return 'no_data';
+        }
+    }
+}
+return null;
+"""
+
+
+class NoDataForDate(Exception):
+    """Raised when the portal confirms that no table is published for a date"""
+
+
+def wait_for_page_state(driver, table_selector, no_data_texts=NO_DATA_TEXTS, timeout=10, poll_frequency=0.2):
+    """
+    Waits until the page shows either the table or the site's no-data state.
+
+    Uses one script call per poll instead of fixed sleeps, so it returns as
+    soon as either state appears. The table counts once it has body rows,
+    so tables filled in after the page has loaded are not read empty.
+
+    Args:
+        driver: The Selenium WebDriver instance, after driver.get().
+        table_selector: The CSS selector for the target table.
+        no_data_texts: Texts that mark a page without data.
+        timeout: Seconds to wait before giving up.
+        poll_frequency: Seconds between two checks.
+
+    Returns:
+        TABLE_READY or NO_DATA.
+
+    Raises:
+        TimeoutException: If neither state appeared within the timeout.
+    """
+    markers = [text.lower() for text in no_data_texts]
+    return WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(
+        lambda d: d.execute_script(PAGE_STATE_SCRIPT, table_selector, markers)
+    )
+
+
+def html_has_no_data(page_html, no_data_texts=NO_DATA_TEXTS):
+    """Whether server-rendered page HTML shows one of the no-data texts"""
+    lowered = page_html.lower()
+    return any(text.lower() in lowered for text in no_data_texts)
@@ -0,0 +1,37 @@
+# Columns of the CMWSSB lake-level table, in the portal's order
+FULL_HEADERS = [
+    "RESERVOIR",
+    "Full Tank Level (ft.)",
+    "Full Capacity (mcft)",
+    "Level (ft)",
+    "Storage (mcft)",
+    "Storage Level (%)",
+    "Inflow (cusecs)",
+    "Outflow (cusecs)",
+    "Rainfall (mm)",
+    "Storage as on same day last year (mcft)",
+]
+
+# Named column sets that can be exported from one scrape
+PROJECTIONS = {
+    "full": FULL_HEADERS,
+    "level": ["RESERVOIR", "Level (ft)"],
+}
+
+
+def resolve_projection(projection):
+    """
+    Turns a projection into the list of headers it selects.
+
+    Args:
+        projection: A name from PROJECTIONS, or a list of header strings for
+            a custom projection.
+
+    Returns:
+        A new list of header strings, without "Date".
+    """
+    if isinstance(projection, str):
+        if projection not in PROJECTIONS:
+            raise ValueError(f"Unknown projection: {projection} (expected one of {', '.join(PROJECTIONS)})")
+        return list(PROJECTIONS[projection])
+    return list(projection)
@@ -0,0 +1,535 @@
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+
+import pandas as pd
+
+from projections import FULL_HEADERS
+from streaming_export import write_rows
+from typed_results import to_typed_frame
+
+# Columns that identify a reading rather than measure something
+KEY_HEADERS = ["RESERVOIR", "Date"]
+
+
+def day_key(date_str):
+    """DD-MM-YYYY as YYYY-MM-DD, which sorts and compares by date"""
+    return datetime.strptime(date_str, "%d-%m-%Y").strftime("%Y-%m-%d")
+
+
+def content_hash(headers, rows):
+    """SHA-256 of a table's headers and cells, the same for the same content"""
+    payload = json.dumps([headers, rows], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def row_keys(headers, rows):
+    """Rows keyed by reservoir, or by position for tables without a RESERVOIR column"""
+    if "RESERVOIR" not in headers:
+        return dict(enumerate(rows))
+    position = headers.index("RESERVOIR")
+    return {reservoir_key(row[position]) if position < len(row) else "": row for row in rows}
+
+
+def table_changes(date_str, headers, old_rows, new_rows):
+    """
+    Cell-level differences between two versions of a date's table
+
+    Returns:
+        A list of dicts with date, reservoir, header, old and new values.
+        A reservoir that appeared or disappeared shows up with every
+        measurement going from or to "".
+    """
+    old_by_key = row_keys(headers, old_rows)
+    new_by_key = row_keys(headers, new_rows)
+    measures = [(index, header) for index, header in enumerate(headers) if header not in KEY_HEADERS]
+    changes = []
+    for key in list(old_by_key) + [key for key in new_by_key if key not in old_by_key]:
+        old_row = old_by_key.get(key, [])
+        new_row = new_by_key.get(key, [])
+        for index, header in measures:
+            old_value = old_row[index] if index < len(old_row) else ""
+            new_value = new_row[index] if index < len(new_row) else ""
+            if old_value != new_value:
+                changes.append({"date": date_str, "reservoir": key, "header": header,
+                                "old": old_value, "new": new_value})
+    return changes
+
+
+def date_from_day(day):
+    """YYYY-MM-DD back to DD-MM-YYYY"""
+    return f"{day[8:10]}-{day[5:7]}-{day[:4]}"
+
+
+def reservoir_key(name):
+    """Reservoir names are matched without case or surrounding spaces"""
+    return str(name).strip().upper()
+
+
+@lru_cache(maxsize=64)
+def project_indexes(stored_headers, headers):
+    """
+    Positions of headers in a stored layout, computed once per layout
+
+    Args:
+        stored_headers (tuple): Headers a date was stored with
+        headers (tuple): Headers to project to
+
+    Returns:
+        A tuple with the index of each header, None where it is missing
+    """
+    positions = {header: index for index, header in reversed(list(enumerate(stored_headers)))}
+    return tuple(positions.get(header) for header in headers)
+
+
+class ResultStore:
+    """
+    Append-as-you-go SQLite store for scraped rows.
+
+    Every date is written and committed in its own transaction as soon as it
+    has been scraped, so a crash or Ctrl+C loses at most the date in flight
+    and a later run can resume from the dates already committed. The Excel
+    (or CSV) output is streamed from the store once the run is finished.
+
+    Dates are stored with every column of the table, so any projection of
+    the columns can be exported later without scraping again.
+
+    Every row is also indexed by (reservoir, date) as it is committed, so
+    one reservoir's history or a single reading is looked up through the
+    index instead of by scanning all dates, see query() and reading().
+
+    Each date is stored with a content hash of its table. refresh_date()
+    uses it to skip unchanged tables, rewrites only the rows that changed
+    and logs every revised value in the revisions table.
+
+    Every commit also takes the next commit_seq, assigned while the write
+    lock is held, so readers can pick up "everything committed since"
+    without relying on clocks.
+    """
+
+    def __init__(self, path):
+        """
+        Open (or create) the store
+
+        Args:
+            path (str): Path of the SQLite file
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        # Several worker processes may commit to the same file, see work_leases.py
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS dates (
+                date TEXT PRIMARY KEY,
+                headers TEXT NOT NULL,
+                committed_at REAL NOT NULL,
+                content_hash TEXT,
+                commit_seq INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS rows (
+                date TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (date, position)
+            );
+            CREATE TABLE IF NOT EXISTS readings (
+                reservoir TEXT NOT NULL,
+                day TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (reservoir, day)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS readings_by_day ON readings (day);
+            CREATE TABLE IF NOT EXISTS revisions (
+                date TEXT NOT NULL,
+                reservoir TEXT NOT NULL,
+                header TEXT NOT NULL,
+                old_value TEXT NOT NULL,
+                new_value TEXT NOT NULL,
+                detected_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS revisions_by_time ON revisions (detected_at);
+            """
+        )
+        self.migrate()
+        self.connection.execute("CREATE INDEX IF NOT EXISTS dates_by_commit ON dates (commit_seq)")
+        self.connection.commit()
+
+        # Stores written before the index existed are indexed once
+        has_rows = self.connection.execute("SELECT 1 FROM rows LIMIT 1").fetchone()
+        has_readings = self.connection.execute("SELECT 1 FROM readings LIMIT 1").fetchone()
+        if has_rows and not has_readings:
+            print(f"Indexing {self.path} by reservoir and date")
+            self.reindex()
+
+    def migrate(self):
+        """
+        Add the columns newer versions keep to a store written by an older one
+
+        Runs under the write lock, so processes opening the same store at the
+        same time cannot both add a column.
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            columns = [column for _, column, *_ in self.connection.execute("PRAGMA table_info(dates)")]
+            if "content_hash" not in columns:
+                # Hashes follow on the next commit of each date
+                self.connection.execute("ALTER TABLE dates ADD COLUMN content_hash TEXT")
+            if "commit_seq" not in columns:
+                # Number the stored dates in the order they were committed
+                self.connection.execute("ALTER TABLE dates ADD COLUMN commit_seq INTEGER")
+                stored = self.connection.execute("SELECT date FROM dates ORDER BY committed_at, date").fetchall()
+                self.connection.executemany(
+                    "UPDATE dates SET commit_seq = ? WHERE date = ?",
+                    [(seq, date_str) for seq, (date_str,) in enumerate(stored, start=1)],
+                )
+        except BaseException:
+            self.connection.rollback()
+            raise
+        self.connection.commit()
+
+    def commit_date(self, date_str, headers, rows):
+        """
+        Replace the rows stored for a date and commit immediately
+
+        Args:
+            date_str (str): Date in DD-MM-YYYY format
+            headers (list): Column headers of the rows, including "Date"
+            rows (list): Rows for the date as lists of strings
+        """
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM rows WHERE date = ?", (date_str,))
+            # The write lock is held from the DELETE on, so commit_seq follows the commit order
+            self.connection.execute(
+                "INSERT OR REPLACE INTO dates (date, headers, committed_at, content_hash, commit_seq) "
+                "VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(commit_seq), 0) + 1 FROM dates))",
+                (date_str, json.dumps(headers), time.time(), content_hash(headers, rows)),
+            )
+            self.connection.executemany(
+                "INSERT INTO rows VALUES (?, ?, ?)",
+                [(date_str, position, json.dumps(row)) for position, row in enumerate(rows)],
+            )
+            self.index_date(date_str, headers, rows)
+
+    def refresh_date(self, date_str, headers, rows):
+        """
+        Store a re-scraped table, writing only what changed
+
+        The content hash decides whether anything changed at all. If it did
+        and the layout is the same, only the rows that differ are rewritten
+        and every changed value is logged in the revisions table.
+
+        Returns:
+            A tuple: (state, changes). state is "new", "unchanged" or
+            "revised"; changes is the list from table_changes().
+        """
+        new_hash = content_hash(headers, rows)
+        with self.lock:
+            stored = self.connection.execute(
+                "SELECT headers, content_hash FROM dates WHERE date = ?", (date_str,)
+            ).fetchone()
+        if stored is None:
+            self.commit_date(date_str, headers, rows)
+            return "new", []
+        if stored[1] == new_hash:
+            return "unchanged", []
+
+        stored_headers = json.loads(stored[0])
+        old_rows = self.rows_for_date(date_str, headers)
+        changes = table_changes(date_str, headers, old_rows, rows)
+        if stored_headers != headers:
+            # A new table layout replaces the whole date
+            self.commit_date(date_str, headers, rows)
+        else:
+            with self.lock, self.connection:
+                changed = [(position, row) for position, row in enumerate(rows)
+                           if position >= len(old_rows) or old_rows[position] != row]
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO rows VALUES (?, ?, ?)",
+                    [(date_str, position, json.dumps(row)) for position, row in changed],
+                )
+                self.connection.execute("DELETE FROM rows WHERE date = ? AND position >= ?", (date_str, len(rows)))
+                self.connection.execute(
+                    "UPDATE dates SET committed_at = ?, content_hash = ?, "
+                    "commit_seq = (SELECT COALESCE(MAX(commit_seq), 0) + 1 FROM dates) WHERE date = ?",
+                    (time.time(), new_hash, date_str),
+                )
+                if changed or len(rows) != len(old_rows):
+                    self.index_date(date_str, headers, rows)
+
+        if not changes:
+            # Only the hash was missing (older store) or the row order moved
+            return "unchanged", []
+
+        detected_at = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO revisions VALUES (?, ?, ?, ?, ?, ?)",
+                [(change["date"], str(change["reservoir"]), change["header"], change["old"], change["new"], detected_at)
+                 for change in changes],
+            )
+        return "revised", changes
+
+    def revisions(self, since=None):
+        """
+        Logged revisions, oldest first
+
+        Args:
+            since (float): Only revisions detected after this Unix time
+
+        Returns:
+            A DataFrame with date, reservoir, header, old_value, new_value
+            and detected_at
+        """
+        with self.lock:
+            cursor = self.connection.execute(
+                "SELECT date, reservoir, header, old_value, new_value, detected_at FROM revisions "
+                "WHERE detected_at > ? ORDER BY detected_at, rowid", (since or 0,)
+            )
+            found = cursor.fetchall()
+        return pd.DataFrame(found, columns=["date", "reservoir", "header", "old_value", "new_value", "detected_at"])
+
+    def index_date(self, date_str, headers, rows):
+        """
+        Replace the (reservoir, date) readings of a date
+
+        Called inside the commit_date transaction, so the index never
+        disagrees with the rows.
+        """
+        day = day_key(date_str)
+        self.connection.execute("DELETE FROM readings WHERE day = ?", (day,))
+        if "RESERVOIR" not in headers:
+            return
+
+        position = headers.index("RESERVOIR")
+        measures = [(index, header) for index, header in enumerate(headers) if header not in KEY_HEADERS]
+        readings = []
+        for row in rows:
+            if position < len(row) and reservoir_key(row[position]):
+                data = {header: row[index] for index, header in measures if index < len(row)}
+                readings.append((reservoir_key(row[position]), day, json.dumps(data)))
+        self.connection.executemany("INSERT OR REPLACE INTO readings VALUES (?, ?, ?)", readings)
+
+    def reindex(self):
+        """Rebuild the (reservoir, date) index from the stored rows"""
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM readings")
+            stored = self.connection.execute("SELECT date, headers FROM dates").fetchall()
+            for date_str, headers in stored:
+                cursor = self.connection.execute(
+                    "SELECT data FROM rows WHERE date = ? ORDER BY position", (date_str,)
+                )
+                self.index_date(date_str, json.loads(headers), [json.loads(data) for (data,) in cursor])
+
+    def committed_dates(self, headers=None):
+        """
+        Dates that have been committed
+
+        Args:
+            headers (list): Only count dates stored with all of these headers
+
+        Returns:
+            A set of date strings
+        """
+        wanted = set(headers or [])
+        with self.lock:
+            cursor = self.connection.execute("SELECT date, headers FROM dates")
+            return {date_str for date_str, stored in cursor if wanted <= set(json.loads(stored))}
+
+    def stored_headers(self):
+        """Every header stored for any date, in first-seen order"""
+        with self.lock:
+            cursor = self.connection.execute("SELECT DISTINCT headers FROM dates")
+            layouts = [json.loads(stored) for (stored,) in cursor]
+        return list(dict.fromkeys(header for layout in layouts for header in layout))
+
+    def headers_for_date(self, date_str):
+        """Headers a date was stored with, or None if it is not stored"""
+        with self.lock:
+            row = self.connection.execute("SELECT headers FROM dates WHERE date = ?", (date_str,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def rows_for_date(self, date_str, headers=None):
+        """
+        Rows stored for a date, in their original order
+
+        Args:
+            headers (list): Columns to return, in this order. Defaults to
+                the columns the date was stored with.
+        """
+        with self.lock:
+            cursor = self.connection.execute(
+                "SELECT data FROM rows WHERE date = ? ORDER BY position", (date_str,)
+            )
+            rows = [json.loads(data) for (data,) in cursor]
+
+        if headers is None:
+            return rows
+        indexes = project_indexes(tuple(self.headers_for_date(date_str) or []), tuple(headers))
+        return [[row[index] if index is not None and index < len(row) else "" for index in indexes] for row in rows]
+
+    def iter_rows(self, dates, headers):
+        """
+        Stored rows in export order, read one date at a time
+
+        Args:
+            dates (list): Input dates in order, with duplicates; each
+                date's rows are yielded once per occurrence. Stored dates
+                that are not listed follow, in date order.
+            headers (list): Column headers, including "Date". Dates stored
+                with other columns are projected to these.
+        """
+        # Every stored date is exported; headers a date lacks are left empty
+        stored = self.committed_dates()
+        listed = set(dates)
+        unlisted = sorted((date_str for date_str in stored if date_str not in listed), key=day_key)
+        for date_str in dates:
+            if date_str in stored:
+                yield from self.rows_for_date(date_str, headers)
+        for date_str in unlisted:
+            yield from self.rows_for_date(date_str, headers)
+
+    def export(self, output_file_path, dates, headers, split=None, split_into="sheets", chunk_size=1000):
+        """
+        Stream the stored rows to an Excel or CSV file
+
+        Rows are read from the store and written in chunks with write-only
+        worksheets, so memory use stays flat however many rows there are.
+
+        Args:
+            output_file_path (str): .xlsx or .csv file to write
+            dates (list): Input dates in order, see iter_rows()
+            headers (list): Column headers, including "Date"
+            split (str): None, or "reservoir" / "year" for one part each
+            split_into (str): "sheets" of one workbook or separate "files"
+
+        Returns:
+            The summary from streaming_export.write_rows(), or None if there
+            was nothing to export
+        """
+        return write_rows(self.iter_rows(dates, headers), headers, output_file_path,
+                          split, split_into, chunk_size)
+
+    def reservoirs(self):
+        """Every reservoir in the index, sorted"""
+        with self.lock:
+            cursor = self.connection.execute("SELECT DISTINCT reservoir FROM readings ORDER BY reservoir")
+            return [reservoir for (reservoir,) in cursor]
+
+    def reading(self, reservoir, date_str):
+        """
+        Point lookup of one reservoir on one date
+
+        Returns:
+            A dict of the stored columns (including RESERVOIR and Date), or
+            None if that reading is not stored
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT data FROM readings WHERE reservoir = ? AND day = ?",
+                (reservoir_key(reservoir), day_key(date_str)),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"RESERVOIR": reservoir_key(reservoir), "Date": date_str, **json.loads(row[0])}
+
+    def query(self, reservoirs=None, start=None, end=None, columns=None, typed=False):
+        """
+        Range lookup of readings through the (reservoir, date) index
+
+        For example the level of POONDI across 2024:
+            store.query("POONDI", "01-01-2024", "31-12-2024", ["Level (ft)"])
+
+        Args:
+            reservoirs: A reservoir name or a list of them, None for all
+            start (str): First date (DD-MM-YYYY), None for no lower bound
+            end (str): Last date (DD-MM-YYYY), included
+            columns (list): Measurement columns to return, None for all
+            typed (bool): Convert the cells with the typed result schema
+                (float32 measurements, datetime dates)
+
+        Returns:
+            A DataFrame with RESERVOIR, Date and the columns, ordered by
+            reservoir and date
+        """
+        conditions, parameters = [], []
+        if reservoirs is not None:
+            names = [reservoirs] if isinstance(reservoirs, str) else list(reservoirs)
+            conditions.append(f"reservoir IN ({', '.join('?' * len(names))})")
+            parameters.extend(reservoir_key(name) for name in names)
+        if start is not None:
+            conditions.append("day >= ?")
+            parameters.append(day_key(start))
+        if end is not None:
+            conditions.append("day <= ?")
+            parameters.append(day_key(end))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # Without reservoirs, a date range is read through the day index and sorted afterwards
+        order = "reservoir, day" if reservoirs is not None or not conditions else "day, reservoir"
+        with self.lock:
+            cursor = self.connection.execute(
+                f"SELECT reservoir, day, data FROM readings {where} ORDER BY {order}", parameters
+            )
+            found = sorted(cursor.fetchall(), key=lambda reading: reading[:2])
+
+        records = [
+            {"RESERVOIR": reservoir, "Date": date_from_day(day), **json.loads(data)}
+            for reservoir, day, data in found
+        ]
+        columns = list(columns) if columns is not None else self.measure_headers()
+        df = pd.DataFrame.from_records(records, columns=KEY_HEADERS + columns).fillna("")
+        return to_typed_frame(df) if typed else df
+
+    def measure_headers(self):
+        """Stored measurement columns, in the portal's column order"""
+        stored = [header for header in self.stored_headers() if header not in KEY_HEADERS]
+        order = {header: index for index, header in enumerate(FULL_HEADERS)}
+        return sorted(stored, key=lambda header: order.get(header, len(order)))
+
+    def export_segregated(self, output_file_path, columns=None, chunk_size=5000):
+        """
+        Write the readings grouped by reservoir, in date order within each
+
+        This is the layout of Reservoir-wise_Segregated_Data_by_Date.csv:
+        RESERVOIR, Date and the measurement columns. Rows come straight
+        from the index in (reservoir, date) order and are written in
+        chunks, so nothing is sorted or loaded into memory as a whole. The
+        file is left alone when no date was committed since it was written.
+
+        Returns:
+            The number of rows written, or None if the file was up to date
+        """
+        with self.lock:
+            last_commit = self.connection.execute("SELECT MAX(committed_at) FROM dates").fetchone()[0]
+        if last_commit is not None and os.path.exists(output_file_path) and os.path.getmtime(output_file_path) > last_commit:
+            return None
+
+        columns = list(columns) if columns is not None else self.measure_headers()
+        temporary_path = output_file_path + ".tmp"
+        written = 0
+        with self.lock, open(temporary_path, "w", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(KEY_HEADERS + columns)
+            cursor = self.connection.execute("SELECT reservoir, day, data FROM readings ORDER BY reservoir, day")
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                for reservoir, day, data in chunk:
+                    cells = json.loads(data)
+                    writer.writerow([reservoir, date_from_day(day)] + [cells.get(column, "") for column in columns])
+                written += len(chunk)
+        os.replace(temporary_path, output_file_path)
+        return written
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
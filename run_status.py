@@ -0,0 +1,78 @@
+import csv
+import threading
+from collections import Counter
+
+OK = "ok"
+NO_DATA = "no_data"
+EMPTY = "empty"
+NOT_CACHED = "not_cached"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+# Outcomes worth trying again later; the others are final
+RETRYABLE = {TIMEOUT, ERROR}
+
+
+class DateStatusBoard:
+    """
+    Thread-safe record of what happened to every date in a run.
+
+    extract_data_for_date records the outcome of each attempt here; the pool
+    reads it to decide whether to retry, and the run ends with report().
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def record(self, date_str, outcome, detail=""):
+        """Record the outcome of one attempt for a date"""
+        # Keep only the first line of multi-line driver messages
+        detail = detail.strip().splitlines()[0] if detail.strip() else ""
+        with self.lock:
+            entry = self.entries.setdefault(date_str, {"status": outcome, "attempts": 0, "detail": ""})
+            entry["status"] = outcome
+            entry["attempts"] += 1
+            entry["detail"] = detail
+
+    def outcome(self, date_str):
+        """Status of the latest attempt for a date, or None if never tried"""
+        with self.lock:
+            entry = self.entries.get(date_str)
+            return entry["status"] if entry else None
+
+    def attempts(self, date_str):
+        with self.lock:
+            entry = self.entries.get(date_str)
+            return entry["attempts"] if entry else 0
+
+    def report(self, report_path=None):
+        """
+        Print a summary of the run and optionally write the per-date report
+
+        Args:
+            report_path (str): CSV file for one line per date (date, status,
+                attempts, detail)
+        """
+        with self.lock:
+            # Chronological order for DD-MM-YYYY keys
+            entries = sorted(self.entries.items(), key=lambda item: item[0][6:] + item[0][3:5] + item[0][:2])
+
+        counts = Counter(entry["status"] for _, entry in entries)
+        print("\nPer-date status:")
+        for status, count in sorted(counts.items()):
+            print(f"  {status}: {count}")
+
+        for date_str, entry in entries:
+            if entry["status"] in RETRYABLE:
+                print(f"  FAILED {date_str} after {entry['attempts']} attempts: {entry['detail']}")
+
+        if report_path:
+            with open(report_path, "w", newline="") as handle:
+                writer = csv.writer(handle)
+                writer.writerow(["Date", "Status", "Attempts", "Detail"])
+                for date_str, entry in entries:
+                    writer.writerow([date_str, entry["status"], entry["attempts"], entry["detail"]])
+            print(f"Status report saved to {report_path}")
+
+        return counts
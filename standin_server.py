@@ -0,0 +1,233 @@
+import argparse
+import html
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+# Column order of the table on the CMWSSB lake-level page
+PORTAL_HEADERS = [
+    "RESERVOIR",
+    "Full Tank Level (ft.)",
+    "Full Capacity (mcft)",
+    "Level (ft)",
+    "Storage (mcft)",
+    "Storage Level (%)",
+    "Inflow (cusecs)",
+    "Outflow (cusecs)",
+    "Rainfall (mm)",
+    "Storage as on same day last year (mcft)",
+]
+
+TABLE_CLASSES = "lack-view table table-responsive table-striped table-bordered"
+
+NO_DATA_PAGE = """<!DOCTYPE html>
+<html><head><title>Lake Level</title></head>
+<body><div class="container"><h2>Lake Level</h2>
+<p class="alert alert-info">No data found for the selected date.</p>
+</div></body></html>
+"""
+
+
+def load_pages(csv_path="Reservoir-wise_Segregated_Data_by_Date.csv"):
+    """
+    Builds the table rows served for every date in the segregated CSV.
+
+    Args:
+        csv_path: The reservoir-by-date CSV checked into the repo.
+
+    Returns:
+        A dict mapping DD-MM-YYYY date strings to lists of rows, each row
+        ordered like PORTAL_HEADERS. Columns missing from the CSV are empty.
+    """
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    for header in PORTAL_HEADERS:
+        if header not in df.columns:
+            df[header] = ""
+
+    pages = {}
+    for date_str, group in df.groupby("Date", sort=False):
+        pages[date_str] = group[PORTAL_HEADERS].values.tolist()
+    return pages
+
+
+def render_table_page(rows):
+    """Renders a lake-level page with the table markup the portal uses"""
+    header_cells = "".join(f"<th>{html.escape(header)}</th>" for header in PORTAL_HEADERS)
+    body_rows = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>\n"
+        for row in rows
+    )
+    return f"""<!DOCTYPE html>
+<html><head><title>Lake Level</title></head>
+<body><div class="container"><h2>Lake Level</h2>
+<table class="{TABLE_CLASSES}">
+<thead><tr>{header_cells}</tr></thead>
+<tbody>
+{body_rows}</tbody>
+</table>
+</div></body></html>
+"""
+
+
+class StandInServer:
+    """
+    Local HTTP stand-in for the CMWSSB lake-level page.
+
+    Serves /lake-level?date=DD-MM-YYYY with the portal's table.lack-view
+    markup, generated from the repo's segregated CSV. Latency, error rate
+    and missing dates are configurable so the scraper can be benchmarked
+    and tested without hitting the live portal.
+    """
+
+    def __init__(self, csv_path="Reservoir-wise_Segregated_Data_by_Date.csv", host="127.0.0.1", port=0,
+                 latency=0.0, jitter=0.0, error_rate=0.0, missing_rate=0.0, missing_dates=(),
+                 synthesize=False, seed=None):
+        """
+        Args:
+            csv_path (str): CSV the served tables are generated from
+            host (str): Interface to listen on
+            port (int): Port to listen on, 0 picks a free one
+            latency (float): Seconds added to every response
+            jitter (float): Extra random latency of up to this many seconds
+            error_rate (float): Fraction of requests answered with HTTP 500
+            missing_rate (float): Fraction of dates answered with the no-data page
+            missing_dates (iterable): Dates that always get the no-data page
+            synthesize (bool): Serve dates that are not in the CSV with the
+                rows of a CSV date, so benchmarks can use long date ranges
+            seed (int): Seed for the random latency, errors and missing dates
+        """
+        self.pages = load_pages(csv_path)
+        self.page_dates = sorted(self.pages)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.missing_rate = missing_rate
+        self.missing_dates = set(missing_dates)
+        self.synthesize = synthesize
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; with Nagle on, every keep-alive
+            # request after the first would wait for the client's delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                status, body = server.respond(self.path)
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                with server.lock:
+                    server.bytes_sent += len(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        """The value to use as LakeLevelScraper.base_url"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/lake-level?date="
+
+    def rows_for(self, date_str):
+        """Rows served for a date, or None if the date has no data"""
+        if date_str in self.pages:
+            return self.pages[date_str]
+        if not self.synthesize or not self.page_dates:
+            return None
+        try:
+            ordinal = datetime.strptime(date_str, "%d-%m-%Y").toordinal()
+        except ValueError:
+            return None
+        return self.pages[self.page_dates[ordinal % len(self.page_dates)]]
+
+    def respond(self, path):
+        """
+        Build the response for a request path
+
+        Returns:
+            A tuple: (http_status, html_body)
+        """
+        with self.lock:
+            self.requests += 1
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self.random.random() < self.error_rate
+            dropped = self.random.random() < self.missing_rate
+
+        if delay:
+            time.sleep(delay)
+
+        url = urlparse(path)
+        if url.path.rstrip("/") != "/lake-level":
+            return 404, "<html><body>Not found</body></html>"
+        if failed:
+            return 500, "<html><body>Internal Server Error</body></html>"
+
+        date_str = parse_qs(url.query).get("date", [""])[0]
+        rows = self.rows_for(date_str)
+        if rows is None or dropped or date_str in self.missing_dates:
+            return 200, NO_DATA_PAGE
+        return 200, render_table_page(rows)
+
+    def start(self):
+        """Serve requests on a background thread"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the CMWSSB lake-level page")
+    parser.add_argument("--csv", default="Reservoir-wise_Segregated_Data_by_Date.csv")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of HTTP 500 responses")
+    parser.add_argument("--missing-rate", type=float, default=0.0, help="fraction of no-data pages")
+    parser.add_argument("--synthesize", action="store_true", help="serve dates that are not in the CSV")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = StandInServer(args.csv, args.host, args.port, args.latency, args.jitter, args.error_rate,
+                           args.missing_rate, synthesize=args.synthesize, seed=args.seed)
+    print(f"Serving {len(server.pages)} dates at {server.base_url}<DD-MM-YYYY>")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
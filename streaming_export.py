@@ -0,0 +1,148 @@
+import csv
+import os
+import re
+from itertools import islice
+
+from openpyxl import Workbook
+
+# Ways an export can be split, and where the parts go
+SPLITS = ("reservoir", "year")
+SPLIT_INTO = ("sheets", "files")
+
+# Characters Excel does not allow in sheet names
+INVALID_SHEET_CHARACTERS = re.compile(r"[\[\]:*?/\\]")
+
+
+def split_key_function(split, headers):
+    """
+    Returns a function that maps a row to the part it belongs to.
+
+    Args:
+        split: None for one part, "reservoir" or "year" (of the Date column).
+        headers: Column headers of the rows.
+    """
+    if split is None:
+        return lambda row: None
+    if split not in SPLITS:
+        raise ValueError(f"Unknown split: {split} (expected one of {', '.join(SPLITS)})")
+
+    column = "RESERVOIR" if split == "reservoir" else "Date"
+    if column not in headers:
+        raise ValueError(f"Splitting by {split} needs the {column} column")
+    index = headers.index(column)
+    if split == "reservoir":
+        return lambda row: str(row[index]).strip() or "UNKNOWN"
+    return lambda row: str(row[index])[-4:] or "UNKNOWN"
+
+
+def sheet_title(key):
+    """A valid Excel sheet name for a part"""
+    return INVALID_SHEET_CHARACTERS.sub("_", str(key))[:31] or "Sheet"
+
+
+def file_suffix(key):
+    """A file-name friendly version of a part"""
+    return re.sub(r"[^\w.-]+", "_", str(key)).strip("_") or "part"
+
+
+class XlsxFile:
+    """Write-only workbook: rows go to temporary XML as they are appended"""
+
+    def __init__(self, path, headers):
+        self.path = path
+        self.headers = headers
+        self.workbook = Workbook(write_only=True)
+        self.sheets = {}
+
+    def append(self, sheet_name, rows):
+        sheet = self.sheets.get(sheet_name)
+        if sheet is None:
+            sheet = self.sheets[sheet_name] = self.workbook.create_sheet(sheet_name)
+            sheet.append(self.headers)
+        for row in rows:
+            sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+class CsvFile:
+    """CSV file written through a buffered handle, one sheet only"""
+
+    def __init__(self, path, headers):
+        self.path = path
+        self.handle = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.handle)
+        self.writer.writerow(headers)
+
+    def append(self, sheet_name, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.handle.close()
+
+
+def write_rows(rows, headers, output_file_path, split=None, split_into="sheets", chunk_size=1000):
+    """
+    Streams rows to an xlsx or CSV file, optionally split into parts.
+
+    Rows are taken from the iterable chunk_size at a time and appended to
+    write-only worksheets (or CSV writers), so memory use does not grow with
+    the number of rows. The format follows the file extension.
+
+    Args:
+        rows: Iterable of rows (lists of cells), e.g. ResultStore.iter_rows().
+        headers: Column headers, written at the top of every sheet and file.
+        output_file_path: Path of the .xlsx or .csv file to write.
+        split: None, "reservoir" or "year".
+        split_into: "sheets" puts every part on its own sheet of one
+            workbook; "files" writes <name>_<part>.<ext> files instead. CSV
+            output is always split into files.
+        chunk_size: Rows read and written per step.
+
+    Returns:
+        A dict with the number of "rows" and unique "dates" written and the
+        "paths" of the files, or None if there were no rows.
+    """
+    if split_into not in SPLIT_INTO:
+        raise ValueError(f"Unknown split_into: {split_into} (expected one of {', '.join(SPLIT_INTO)})")
+
+    headers = list(headers)
+    key_of = split_key_function(split, headers)
+    base, extension = os.path.splitext(output_file_path)
+    file_class = CsvFile if extension.lower() == ".csv" else XlsxFile
+    separate_files = split is not None and (split_into == "files" or file_class is CsvFile)
+    date_index = headers.index("Date") if "Date" in headers else None
+
+    files = {}
+    written = 0
+    dates = set()
+    rows = iter(rows)
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            parts = {}
+            for row in chunk:
+                parts.setdefault(key_of(row), []).append(row)
+            for key, part_rows in parts.items():
+                if separate_files:
+                    path, sheet_name = f"{base}_{file_suffix(key)}{extension}", "Sheet1"
+                else:
+                    path, sheet_name = output_file_path, sheet_title(key) if key is not None else "Sheet1"
+                if path not in files:
+                    files[path] = file_class(path, headers)
+                files[path].append(sheet_name, part_rows)
+
+            written += len(chunk)
+            if date_index is not None:
+                dates.update(row[date_index] for row in chunk)
+    finally:
+        for output in files.values():
+            output.close()
+
+    if not written:
+        return None
+    return {"rows": written, "dates": len(dates), "paths": list(files)}
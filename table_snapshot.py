@@ -0,0 +1,118 @@
+from functools import lru_cache
+
+from selenium.common.exceptions import WebDriverException
+
+# Reads the header row and every body cell of a table in a single
+# execute_script call, instead of one WebDriver round trip per element.
+TABLE_SNAPSHOT_SCRIPT = """
+var table = arguments[0];
+function cellText(cell) {
+    return (cell.innerText || cell.textContent || '').trim();
+}
+var headerRow = table.querySelector('thead tr');
+var headers = headerRow
+    ? Array.prototype.map.call(headerRow.querySelectorAll('th'), cellText)
+    : [];
+var rows = [];
+var body = table.querySelector('tbody');
+if (body) {
+    Array.prototype.forEach.call(body.querySelectorAll('tr'), function (tr) {
+        rows.push(Array.prototype.map.call(tr.querySelectorAll('td'), cellText));
+    });
+}
+return {headers: headers, rows: rows};
+"""
+
+
+def snapshot_table(driver, table):
+    """
+    Reads a whole table from the browser with one script call.
+
+    Args:
+        driver: The Selenium WebDriver instance.
+        table: The WebElement of the table to read.
+
+    Returns:
+        A tuple: (header_texts, rows) with all headers and all body cells as
+        plain strings, or None if the script could not be run.
+    """
+    try:
+        snapshot = driver.execute_script(TABLE_SNAPSHOT_SCRIPT, table)
+    except WebDriverException as e:
+        print(f"Single-call table extraction failed, falling back to per-cell reads: {e}")
+        return None
+
+    if not isinstance(snapshot, dict):
+        return None
+
+    header_texts = [str(text).strip() for text in snapshot.get("headers") or []]
+    rows = [[str(text).strip() for text in row] for row in snapshot.get("rows") or []]
+    return header_texts, rows
+
+
+@lru_cache(maxsize=64)
+def column_layout(header_texts, column_headers):
+    """
+    Maps the desired headers to column positions for one table layout.
+
+    The portal serves the same header row for every date, so the mapping is
+    worked out (and any missing headers reported) once per layout and then
+    reused from the cache.
+
+    Args:
+        header_texts: Tuple of all header strings of the table.
+        column_headers: Tuple of desired headers, or None for every column.
+
+    Returns:
+        A tuple: (actual_headers_found, column_indexes)
+    """
+    if column_headers is None:
+        return header_texts, tuple(range(len(header_texts)))
+
+    print(f"New table layout, available headers: {list(header_texts)}")
+    positions = {header: index for index, header in reversed(list(enumerate(header_texts)))}
+
+    actual_headers_found = []
+    column_indexes = []
+    for header in column_headers:
+        if header in positions:
+            actual_headers_found.append(header)
+            column_indexes.append(positions[header])
+        else:
+            print(f"Warning: Header '{header}' not found in the table.")
+
+    if column_indexes:
+        print(f"Found {len(actual_headers_found)} matching headers: {actual_headers_found}")
+    return tuple(actual_headers_found), tuple(column_indexes)
+
+
+def select_columns(header_texts, rows, column_headers):
+    """
+    Picks the desired columns out of a table that has already been read.
+
+    Args:
+        header_texts: List of all header strings of the table.
+        rows: List of rows, each a list of cell strings.
+        column_headers: A list of strings representing the desired column
+            headers, or None to keep every column.
+
+    Returns:
+        A tuple: (actual_headers_found, data), the same shape that
+        extract_table_data returns.
+    """
+    if column_headers is None:
+        return (header_texts, rows) if header_texts else ([], [])
+
+    actual_headers_found, column_indexes = column_layout(
+        tuple(header_texts), tuple(column_headers)
+    )
+    if not column_indexes:
+        print("No matching headers found. Cannot extract data.")
+        return [], []
+
+    data = []
+    for cells in rows:
+        # Add empty string if cell index is out of bounds
+        data.append([cells[index] if index < len(cells) else "" for index in column_indexes])
+
+    return list(actual_headers_found), data
@@ -0,0 +1,106 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter shared by all workers.
+
+    Tokens are added at `rate` per second up to `burst`; every request takes
+    one token and blocks until one is available. A fast server is therefore
+    hit at the full budget, never faster, without a fixed sleep per date.
+    """
+
+    def __init__(self, rate, burst=1):
+        """
+        Args:
+            rate (float): Requests per second allowed across all workers
+            burst (int): Requests that may go out back to back after idling
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, stop=None):
+        """
+        Take one token, waiting until one is available
+
+        Args:
+            stop (threading.Event): Optional event that aborts the wait
+
+        Returns:
+            True once a token was taken, False if stop was set while waiting
+        """
+        if self.rate <= 0:
+            return True
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+
+            if stop is None:
+                time.sleep(wait)
+            elif stop.wait(wait):
+                return False
+
+
+class RetryQueue:
+    """
+    Thread-safe queue of failed items that become due again after a backoff.
+
+    The delay grows exponentially with the attempt number and uses full
+    jitter, so retries from several workers do not arrive at the same time.
+    """
+
+    def __init__(self, base_delay=2.0, max_delay=60.0):
+        """
+        Args:
+            base_delay (float): Delay ceiling before the first retry, in seconds
+            max_delay (float): Upper bound for the delay ceiling
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.heap = []
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def backoff(self, attempt):
+        """Random delay in seconds before retry number `attempt` (1-based)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def schedule(self, item, attempt):
+        """Queue an item to be retried after the backoff for `attempt`"""
+        due = time.monotonic() + self.backoff(attempt)
+        with self.lock:
+            heapq.heappush(self.heap, (due, next(self.counter), item))
+        return due
+
+    def pop_due(self):
+        """Return the next item whose backoff has passed, or None"""
+        with self.lock:
+            if self.heap and self.heap[0][0] <= time.monotonic():
+                return heapq.heappop(self.heap)[2]
+        return None
+
+    def seconds_until_due(self):
+        """Seconds until the next item is due, or None if the queue is empty"""
+        with self.lock:
+            if not self.heap:
+                return None
+            return max(0.0, self.heap[0][0] - time.monotonic())
+
+    def __len__(self):
+        with self.lock:
+            return len(self.heap)
@@ -0,0 +1,148 @@
+import os
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional, typed copies are skipped without it
+    pa = None
+
+# Columns that are not numeric measurements
+LABEL_COLUMNS = ["RESERVOIR", "Date"]
+
+
+def open_parquet(path, schema):
+    return pq.ParquetWriter(path, schema)
+
+
+def open_feather(path, schema):
+    # Feather v2 is the Arrow IPC file format; reservoirs new in a batch are dictionary deltas
+    compression = "lz4" if pa.Codec.is_available("lz4") else None
+    options = pa.ipc.IpcWriteOptions(compression=compression, emit_dictionary_deltas=True)
+    return pa.ipc.new_file(path, schema, options=options)
+
+
+# Writers for the typed copies, by file extension; each takes one batch at a time
+TYPED_FORMATS = {
+    "parquet": open_parquet,
+    "feather": open_feather,
+}
+
+
+def to_typed_batch(headers, rows):
+    """
+    Converts extracted string rows into a typed, compact columnar batch.
+
+    RESERVOIR becomes a categorical column, Date a real datetime column and
+    every other column (level, storage, inflow, outflow, rainfall, ...) a
+    float32 column. Empty or non-numeric cells become missing values.
+
+    Args:
+        headers: Column headers, for example actual_headers + ["Date"].
+        rows: List of rows, each a list of cell strings.
+
+    Returns:
+        A pandas DataFrame with one typed column per header.
+    """
+    return to_typed_frame(pd.DataFrame(rows, columns=headers))
+
+
+def to_typed_frame(df):
+    """
+    Applies the typed result schema to a DataFrame of strings.
+
+    Args:
+        df: A DataFrame as produced by the scraper, with string cells.
+
+    Returns:
+        A new DataFrame with categorical, datetime and float32 columns.
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if column == "RESERVOIR":
+            columns[column] = values.astype("string").str.strip().astype("category")
+        elif column == "Date":
+            columns[column] = pd.to_datetime(values, format="%d-%m-%Y", errors="coerce")
+        else:
+            columns[column] = pd.to_numeric(
+                values.astype("string").str.replace(",", "", regex=False).str.strip(),
+                errors="coerce",
+            ).astype(np.float32)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def extend_categories(batch, known):
+    """
+    Gives the RESERVOIR column of a batch every reservoir seen so far
+
+    New reservoirs are appended to `known`, so every batch's categories
+    extend the previous ones and the files keep one growing dictionary.
+    """
+    if "RESERVOIR" in batch.columns:
+        column = batch["RESERVOIR"]
+        known.extend(name for name in column.cat.categories if name not in known)
+        batch["RESERVOIR"] = column.cat.set_categories(known)
+    return batch
+
+
+def export_typed(rows, headers, output_file_path, formats, chunk_size=1000):
+    """
+    Streams typed copies of the output next to the Excel file.
+
+    Rows are taken chunk_size at a time and converted with
+    to_typed_batch(), and every batch is appended to the open files (a row
+    group in Parquet, a record batch in Feather). Only one batch is in
+    memory at a time.
+
+    Args:
+        rows: Iterable of rows (lists of cell strings), e.g.
+            ResultStore.iter_rows().
+        headers: Column headers of the rows.
+        output_file_path: Path of the Excel output; the typed files use the
+            same name with the format's extension.
+        formats: Format names from TYPED_FORMATS, for example ["parquet"].
+        chunk_size: Rows per batch.
+
+    Returns:
+        A list of the paths that were written.
+    """
+    names = []
+    for name in formats:
+        if name in TYPED_FORMATS:
+            names.append(name)
+        else:
+            print(f"Unknown export format: {name}")
+    if not names:
+        return []
+
+    base = os.path.splitext(output_file_path)[0]
+    if pa is None:
+        print(f"Cannot write {', '.join(f'{base}.{name}' for name in names)}, typed copies need pyarrow")
+        return []
+
+    headers = list(headers)
+    rows = iter(rows)
+    schema = None
+    writers = {}
+    known_reservoirs = []
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            batch = extend_categories(to_typed_batch(headers, chunk), known_reservoirs)
+            if schema is None:
+                schema = pa.Schema.from_pandas(batch, preserve_index=False)
+                writers = {f"{base}.{name}": TYPED_FORMATS[name](f"{base}.{name}", schema) for name in names}
+            table = pa.Table.from_pandas(batch, schema=schema, preserve_index=False)
+            for writer in writers.values():
+                writer.write_table(table)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return list(writers)
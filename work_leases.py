@@ -0,0 +1,216 @@
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+
+
+def default_worker_id():
+    """host:pid plus a random suffix, unique across processes and machines"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class WorkBoard:
+    """
+    Shared SQLite work table that splits dates between scraper processes.
+
+    Dates are grouped into chunks of consecutive dates. A process leases one
+    chunk at a time for lease_seconds and renews the lease while it works;
+    a chunk whose lease has expired (its worker crashed or hung) is handed
+    to the next process that asks for work. Results go to the shared
+    ResultStore, which keeps one entry per date, so a chunk that ends up
+    scraped twice never produces duplicate rows.
+
+    Every process opens the same board file, which must be on a file system
+    with working SQLite locking (a local disk, not most network shares).
+    """
+
+    def __init__(self, path, lease_seconds=300, worker_id=None):
+        """
+        Args:
+            path (str): SQLite file shared by all workers
+            lease_seconds (float): How long a lease lasts without renewal
+            worker_id (str): Name of this worker, unique per process
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or default_worker_id()
+        # Autocommit mode, so BEGIN IMMEDIATE controls the write transactions
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                state TEXT NOT NULL,
+                owner TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS chunk_dates (
+                date TEXT PRIMARY KEY,
+                chunk_id INTEGER NOT NULL,
+                position INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chunk_dates_by_chunk ON chunk_dates (chunk_id, position);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+
+    def transaction(self):
+        """Write transaction that holds the database lock from the start"""
+        return BoardTransaction(self.connection)
+
+    def add_dates(self, dates, chunk_size=10):
+        """
+        Put dates on the board in chunks of consecutive dates
+
+        Dates already waiting or leased are skipped, so every process can
+        add the same input. Dates of finished chunks are added again; the
+        caller only passes dates that are not in the result store yet.
+
+        Returns:
+            The number of dates added
+        """
+        added = 0
+        with self.transaction() as cursor:
+            chunk_id = None
+            position = 0
+            for date_str in dates:
+                row = cursor.execute(
+                    "SELECT chunks.state FROM chunk_dates JOIN chunks ON chunks.id = chunk_dates.chunk_id "
+                    "WHERE chunk_dates.date = ?", (date_str,)
+                ).fetchone()
+                if row and row[0] != DONE:
+                    continue
+                if row:
+                    cursor.execute("DELETE FROM chunk_dates WHERE date = ?", (date_str,))
+
+                if chunk_id is None or position == chunk_size:
+                    cursor.execute("INSERT INTO chunks (state) VALUES (?)", (PENDING,))
+                    chunk_id = cursor.lastrowid
+                    position = 0
+                cursor.execute("INSERT INTO chunk_dates VALUES (?, ?, ?)", (date_str, chunk_id, position))
+                position += 1
+                added += 1
+
+            if added:
+                # New work, so the output has to be exported again at the end
+                cursor.execute("DELETE FROM meta WHERE key = 'exported_by'")
+        return added
+
+    def lease(self):
+        """
+        Lease the next chunk that is pending or whose lease has expired
+
+        Returns:
+            A tuple: (chunk_id, dates), or None if no chunk is available
+        """
+        now = time.time()
+        with self.transaction() as cursor:
+            row = cursor.execute(
+                "SELECT id, state, owner FROM chunks WHERE state = ? OR (state = ? AND lease_until < ?) "
+                "ORDER BY id LIMIT 1", (PENDING, LEASED, now)
+            ).fetchone()
+            if row is None:
+                return None
+
+            chunk_id, state, owner = row
+            if state == LEASED:
+                print(f"Taking over chunk {chunk_id}, the lease of {owner} expired")
+            cursor.execute(
+                "UPDATE chunks SET state = ?, owner = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (LEASED, self.worker_id, now + self.lease_seconds, chunk_id),
+            )
+            dates = [
+                date_str for (date_str,) in cursor.execute(
+                    "SELECT date FROM chunk_dates WHERE chunk_id = ? ORDER BY position", (chunk_id,)
+                )
+            ]
+        return chunk_id, dates
+
+    def renew(self, chunk_id):
+        """Extend our lease on a chunk, False if another worker has taken it over"""
+        with self.transaction() as cursor:
+            cursor.execute(
+                "UPDATE chunks SET lease_until = ? WHERE id = ? AND owner = ? AND state = ?",
+                (time.time() + self.lease_seconds, chunk_id, self.worker_id, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, chunk_id):
+        """Mark a leased chunk as done, False if the lease was lost"""
+        with self.transaction() as cursor:
+            cursor.execute(
+                "UPDATE chunks SET state = ?, lease_until = NULL WHERE id = ? AND owner = ? AND state = ?",
+                (DONE, chunk_id, self.worker_id, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def release(self):
+        """Hand our leased chunks back to the board, for a clean shutdown"""
+        with self.transaction() as cursor:
+            cursor.execute(
+                "UPDATE chunks SET state = ?, owner = NULL, lease_until = NULL WHERE owner = ? AND state = ?",
+                (PENDING, self.worker_id, LEASED),
+            )
+            return cursor.rowcount
+
+    def seconds_until_takeover(self):
+        """
+        Seconds until the next lease held by another worker expires
+
+        Returns:
+            0 if a chunk is available now, None if every chunk is done
+        """
+        row = self.connection.execute(
+            "SELECT SUM(state = ?), MIN(CASE WHEN state = ? THEN lease_until END) FROM chunks",
+            (PENDING, LEASED),
+        ).fetchone()
+        pending, next_expiry = row
+        if pending:
+            return 0.0
+        if next_expiry is None:
+            return None
+        return max(0.0, next_expiry - time.time())
+
+    def claim_export(self):
+        """True for exactly one worker once every chunk is done"""
+        with self.transaction() as cursor:
+            open_chunks = cursor.execute("SELECT COUNT(*) FROM chunks WHERE state != ?", (DONE,)).fetchone()[0]
+            if open_chunks:
+                return False
+            cursor.execute("INSERT OR IGNORE INTO meta VALUES ('exported_by', ?)", (self.worker_id,))
+            return cursor.rowcount == 1
+
+    def progress(self):
+        """Number of dates per chunk state"""
+        cursor = self.connection.execute(
+            "SELECT chunks.state, COUNT(*) FROM chunk_dates JOIN chunks ON chunks.id = chunk_dates.chunk_id "
+            "GROUP BY chunks.state"
+        )
+        return dict(cursor.fetchall())
+
+    def close(self):
+        self.connection.close()
+
+
+class BoardTransaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back if the block raises"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection.cursor()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")